@@ -1,6 +1,12 @@
 import numpy as np
 import random
+from bisect import bisect_left, bisect_right
 import time 
+import weakref
+from time import perf_counter_ns
+from SEMO_topology import Topology, default_topology
+from SEMO_rng import random_draws
+from SEMO_ndtree import NDArchive, pareto_front_nd
 #创建一个100*100的矩阵,每个位置有两个随机数[a,b]，使用多次运行SEMO算法寻找非支配解集，并计算覆盖率
 """
 1. 生成一个100x100的矩阵,每个位置有两个随机数[a,b]
@@ -8,16 +14,79 @@ import time
 3. 实现SEMO算法寻找非支配解集
 4. 计算SEMO找到的非支配解集与真实Pareto前沿点的覆盖率
 """
-def generate_matrix(rows, cols, value_range=(0, 100), decimals=2):
+def generate_matrix(rows, cols, value_range=(0, 100), decimals=2, integer=False, n_obj=2, rng=None):
     """
-    生成一个 (rows x cols x 2) 的矩阵。
-    每个位置有两个随机数：[a, b]
+    生成一个 (rows x cols x n_obj) 的矩阵，默认 n_obj=2。
+    每个位置有 n_obj 个随机数：[a, b] 或 [v0, ..., v{n_obj-1}]
     随机数的取值范围是 value_range，保留小数点后 decimals 位。
     例如，value_range=(0, 100)，decimals=2，则生成的数值可能是 23.45, 67.89 等等。
-    返 回值：numpy 数组，形状为 (rows, cols, 2)
+    integer=True 时以定点整数存储：存储值 = 原值 * 10**decimals，
+    能放进 int16 时用 int16（如 0–100 保留两位小数），否则用 int32 / int64；
+    比较、去重和求前沿都在整数上精确进行，内存只有 float64 的 1/4～1/2。
+    同一随机种子下两种存储方式的支配关系与等值关系完全相同。
+    n_obj=2 时消耗的随机数与原先完全相同。
+    rng 为 numpy Generator 时从它取随机数，不触碰全局的 np.random（默认仍用全局状态）。
+    返 回值：numpy 数组，形状为 (rows, cols, n_obj)
     """
-    mat = np.random.rand(rows, cols, 2) * (value_range[1] - value_range[0]) + value_range[0]
-    return np.round(mat, decimals)
+    u = np.random.rand(rows, cols, n_obj) if rng is None else rng.random((rows, cols, n_obj))
+    mat = u * (value_range[1] - value_range[0]) + value_range[0]
+    if not integer:
+        return np.round(mat, decimals)
+    scale = 10 ** decimals
+    dtype = fixed_point_dtype(value_range[0] * scale, value_range[1] * scale)
+    return np.rint(mat * scale).astype(dtype)
+
+LANDSCAPES = ("random", "correlated", "anticorrelated")
+
+def generate_landscape(kind, rows, cols, seed=0):
+    """
+    生成 (rows x cols x 2) 的测试地形，取值 [0, 100]，保留两位小数，随机数来自 default_rng(seed)：
+    random 两个目标独立均匀；correlated 中 b 与 a 正相关（前沿很小）；
+    anticorrelated 中 b 与 a 负相关（前沿很大）。
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.random((rows, cols)) * 100
+    noise = rng.random((rows, cols)) * 10 - 5
+    if kind == "random":
+        b = rng.random((rows, cols)) * 100
+    elif kind == "correlated":
+        b = np.clip(a + noise, 0, 100)
+    elif kind == "anticorrelated":
+        b = np.clip(100 - a + noise, 0, 100)
+    else:
+        raise ValueError(f"未知的地形: {kind!r}（可选 {LANDSCAPES}）")
+    return np.round(np.stack([a, b], axis=-1), 2)
+
+def fixed_point_dtype(lo, hi):
+    """能容纳 [lo, hi] 的最小有符号整数类型（至少 int16）"""
+    for dtype in (np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    raise ValueError(f"取值范围 [{lo}, {hi}] 超出 int64")
+
+def from_fixed_point(mat, decimals=2):
+    """定点整数矩阵还原为浮点值（用于打印）；浮点矩阵原样返回"""
+    if np.issubdtype(mat.dtype, np.integer):
+        return mat / 10 ** decimals
+    return mat
+
+def pack_objectives(mat):
+    """
+    把整数矩阵的两个目标打包成一个 int64 键：key = (a - a_min) * span_b + (b - b_min)。
+    键的大小顺序就是 (a, b) 的字典序，一次整数排序即可代替双关键字排序。
+    浮点矩阵或打包会溢出时返回 None。
+    """
+    if not np.issubdtype(mat.dtype, np.integer) or mat.size == 0:
+        return None
+    a = mat[:, :, 0].ravel().astype(np.int64)
+    b = mat[:, :, 1].ravel().astype(np.int64)
+    a_min, b_min = int(a.min()), int(b.min())
+    span_a = int(a.max()) - a_min + 1
+    span_b = int(b.max()) - b_min + 1
+    if span_a * span_b >= 2 ** 63:
+        return None
+    return (a - a_min) * span_b + (b - b_min)
 
 def update_population(population, cand, mat):
     cr, cc = cand
@@ -47,22 +116,264 @@ def update_population(population, cand, mat):
     population[:] = new_pop
     return True
 
+class _LazyObjective:
+    """按展平下标读取内存映射矩阵中某一目标的值，读过的格点缓存为 Python 数值"""
+
+    def __init__(self, flat, j):
+        self.flat = flat    # (rows*cols, k) 视图，不复制数据
+        self.j = j          # None 表示读取整行目标值元组
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.flat)
+
+    def __getitem__(self, i):
+        v = self.cache.get(i)
+        if v is None:
+            if self.j is None:
+                v = self.cache[i] = tuple(self.flat[i].tolist())
+            else:
+                v = self.cache[i] = self.flat[i, self.j].item()
+        return v
+
+def objective_lists(mat):
+    """
+    把 (rows, cols, 2) 矩阵拆成两个按展平下标 r*cols+c 取值的 Python 列表 (A, B)。
+    热循环中 A[i] 直接得到 Python 数值，避免 mat[r, c] 每次创建 numpy 标量和临时视图。
+    内存映射矩阵（np.memmap）不整体读入，只按需读取 SEMO 实际访问到的格点。
+    只适用于双目标；k 目标请用 objective_vectors（或按目标数自动选择的 objectives_for）。
+    """
+    if mat.shape[2] != 2:
+        raise ValueError(f"objective_lists 只支持双目标矩阵，当前为 {mat.shape[2]} 个目标")
+    if isinstance(mat, np.memmap):
+        flat = mat.reshape(-1, 2)
+        return _LazyObjective(flat, 0), _LazyObjective(flat, 1)
+    return mat[:, :, 0].ravel().tolist(), mat[:, :, 1].ravel().tolist()
+
+def objective_vectors(mat):
+    """
+    k 目标矩阵 (rows, cols, k) 的目标值元组列表，按展平下标取值（NDArchive 使用）。
+    内存映射矩阵同样按需读取。
+    """
+    flat = mat.reshape(-1, mat.shape[2])
+    if isinstance(mat, np.memmap):
+        return _LazyObjective(flat, None)
+    return list(map(tuple, flat.tolist()))
+
+def objectives_for(mat):
+    """semo_search 的 objectives 参数：双目标为 objective_lists，三个及以上目标为 objective_vectors"""
+    return objective_lists(mat) if mat.shape[2] == 2 else objective_vectors(mat)
+
+def neighbor_dominance_masks(mat, topology):
+    """
+    每个格点一个位掩码（k <= 8 时为 uint8）：第 j 位为 1 表示沿第 j 个方向的邻居
+    被该格点严格支配或与之等值。父节点此刻一定在档案中，
+    所以这样的子节点必然被拒绝，热循环查一次位即可跳过档案比较。
+    三个及以上目标时要求所有目标都不大于父节点。
+    拓扑未预计算邻居表（lazy）或 k > 64 时返回 None。
+    """
+    table = topology.table
+    k = topology.k
+    if table is None or k > 64:
+        return None
+    A = np.ascontiguousarray(mat[:, :, 0]).ravel()
+    B = np.ascontiguousarray(mat[:, :, 1]).ravel()
+    rejected = (A[table] <= A[:, None]) & (B[table] <= B[:, None])
+    for j in range(2, mat.shape[2]):
+        V = np.ascontiguousarray(mat[:, :, j]).ravel()
+        rejected &= V[table] <= V[:, None]
+    dtype = next(t for t in (np.uint8, np.uint16, np.uint32, np.uint64)
+                 if np.iinfo(t).bits >= k)
+    bits = np.left_shift(np.ones(k, dtype=dtype), np.arange(k, dtype=dtype))
+    return np.bitwise_or.reduce(np.where(rejected, bits, dtype(0)), axis=1)
+
+# 由矩阵派生的只读数据（目标值列表、拒绝掩码的列表形式），只为最近一张矩阵保留
+_derived = {"mat": None, "data": {}}
+
+def _matrix_derived(mat, key, build):
+    """
+    按矩阵对象缓存 build() 的结果：同一矩阵上反复调用 run_semo* 时
+    不再每次整表复制目标值、重建拒绝掩码（1000x1000 上各约 0.1s，远超一次停滞运行本身）。
+    只保留最近一张矩阵（弱引用，矩阵释放后缓存随之失效）；缓存期间不应原地修改矩阵。
+    """
+    ref = _derived["mat"]
+    if ref is None or ref() is not mat:
+        _derived["mat"] = weakref.ref(mat)
+        _derived["data"] = {}
+    data = _derived["data"]
+    if key not in data:
+        data[key] = build()
+    return data[key]
+
+def cached_objectives(mat):
+    """objectives_for(mat) 的按矩阵缓存版本（不要原地修改返回的列表）"""
+    return _matrix_derived(mat, "objectives", lambda: objectives_for(mat))
+
+def cached_rejects(mat, topology, as_list=True):
+    """
+    neighbor_dominance_masks(mat, topology) 的按矩阵、邻域与边界缓存的版本；
+    as_list=True 时为热循环用的列表形式，否则为 numpy 数组。lazy 拓扑返回 None。
+    """
+    if topology.table is None:
+        return None
+    key = ("rejects", tuple(topology.stencil), topology.border)
+    masks = _matrix_derived(mat, key, lambda: neighbor_dominance_masks(mat, topology))
+    if not as_list or masks is None:
+        return masks
+    return _matrix_derived(mat, key + ("list",), masks.tolist)
+
+class FlatArchive:
+    """
+    双目标最大化的非支配档案（“阶梯”结构），成员为展平下标 r*cols+c。
+    档案内的点按 a 严格升序排列，此时 b 必然严格降序，
+    因此接收 / 拒绝 / 淘汰都只需一次二分查找加一次连续切片删除。
+    接收规则与 update_population 完全一致：
+    等值点去重、被支配则丢弃、移除被候选点支配的点。
+    目标值从 A、B 两个列表按下标读取（见 objective_lists）。
+    """
+
+    def __init__(self, A, B, cells=()):
+        self.A = A
+        self.B = B
+        self.cells = []   # 成员下标，按 a 升序（原地修改，可直接用于 rng.choice）
+        self._a = []      # 对应的 a 值（升序）
+        self._nb = []     # 对应的 -b 值（升序，即 b 降序），便于 bisect
+        self.last_evicted = []  # 最近一次成功 add 时被淘汰的下标
+        for cell in cells:
+            self.add(cell)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __getitem__(self, i):
+        # 支持 random.choice(archive)
+        return self.cells[i]
+
+    def add(self, cand):
+        """尝试把下标 cand 加入档案，返回是否被接收（同 update_population）"""
+        ca = self.A[cand]
+        cb = self.B[cand]
+
+        # 0) + 1) a >= ca 的点中 b 最大的是第 i 个；若它的 b >= cb，
+        #    则 cand 与其等值或被其严格支配 → 丢弃
+        i = bisect_left(self._a, ca)
+        if i < len(self._a) and -self._nb[i] >= cb:
+            return False
+
+        # 2) a <= ca 的点是前 j 个，其中 b <= cb 的是连续的一段 [k, j)，
+        #    它们都被 cand 严格支配 → 整段替换为 cand
+        j = bisect_right(self._a, ca, i)
+        k = bisect_left(self._nb, -cb, 0, j)
+        self.last_evicted = self.cells[k:j]
+        self.cells[k:j] = [cand]
+        self._a[k:j] = [ca]
+        self._nb[k:j] = [-cb]
+        return True
+
+    def dominated(self, a, b):
+        """(a, b) 是否被档案中某点严格支配（与某点等值不算）"""
+        i = bisect_left(self._a, a)
+        if i == len(self._a):
+            return False
+        ba = -self._nb[i]
+        return ba >= b and (self._a[i] > a or ba > b)
+
+    def covers(self, cell):
+        """下标 cell 是否被档案中某点严格支配"""
+        return self.dominated(self.A[cell], self.B[cell])
+
+    def undominated_by(self, cand, cells):
+        """cells 中不被成员 cand 严格支配的下标集合"""
+        A = self.A
+        B = self.B
+        ca = A[cand]
+        cb = B[cand]
+        return {n for n in cells if not dominates_val(ca, cb, A[n], B[n])}
+
+    def sorted_indices(self):
+        """按 a 降序、b 降序返回成员下标"""
+        return self.cells[::-1]
+
+class ParetoArchive(FlatArchive):
+    """
+    以 (r, c) 坐标为成员的档案，可直接替代 population 列表；
+    内部是展平下标的 FlatArchive，只在接口处做坐标转换。
+    """
+
+    def __init__(self, mat, cells=()):
+        self.mat = mat
+        self.cols = mat.shape[1]
+        A, B = objective_lists(mat)
+        super().__init__(A, B, [r * self.cols + c for r, c in cells])
+
+    def __iter__(self):
+        return (divmod(i, self.cols) for i in self.cells)
+
+    def __getitem__(self, i):
+        return divmod(self.cells[i], self.cols)
+
+    def add(self, cand):
+        """尝试把 cand=(r, c) 加入档案，返回是否被接收（同 update_population）"""
+        r, c = cand
+        return super().add(r * self.cols + c)
+
+    def sorted_cells(self):
+        """按 a 降序、b 降序返回坐标列表（与原先 population.sort 的顺序一致）"""
+        return [divmod(i, self.cols) for i in self.sorted_indices()]
+
 def pareto_best_points(mat):
     """
-    使用与 update_population 相同的档案更新规则，
-    扫描整张矩阵得到真实非支配解集合（双目标最大化）。
+    向量化计算真实非支配解集合（双目标最大化），O(N log N)。
+    与 update_population 的档案规则完全一致：严格支配才淘汰，
+    等值重复点只保留行优先顺序中的第一个。
     返回 [(r, c, a, b)]，按 a 降序、b 降序排序。
+    三个及以上目标时改用 pareto_front_nd（返回 [(r, c, v0, v1, ...)]，按字典序降序）。
+    """
+    rows, cols, n_obj = mat.shape
+    if n_obj > 2:
+        return pareto_front_nd(mat)
+    a = mat[:, :, 0].ravel()
+    b = mat[:, :, 1].ravel()
+
+    # 按 a 降序、b 降序排序；两种排序都是稳定的，等值点保持行优先顺序。
+    # 定点整数矩阵用打包后的单个 int64 键排序，浮点矩阵用双关键字 lexsort
+    key = pack_objectives(mat)
+    if key is not None:
+        order = np.argsort(-key, kind="stable")
+    else:
+        order = np.lexsort((-b, -a))
+    sb = b[order]
+    if sb.size == 0:
+        return []
+
+    # 排在某点之前的点 a 都不小于它：只要其中有 b >= 它的 b，
+    # 它就被严格支配或是后出现的等值点 → 只保留 b 严格刷新前缀最大值的点
+    keep = np.empty(sb.size, dtype=bool)
+    keep[0] = True
+    keep[1:] = sb[1:] > np.maximum.accumulate(sb[:-1])
+    idx = order[keep]
+
+    return [(r, c, mat[r, c, 0], mat[r, c, 1])
+            for r, c in zip(*(x.tolist() for x in np.divmod(idx, cols)))]
+
+def pareto_best_points_scan(mat):
+    """
+    逐点调用档案更新规则扫描整张矩阵的参考实现，
+    用于校验 pareto_best_points 的结果。
     """
     rows, cols, _ = mat.shape
-    archive = []  # 与 SEMO 的 population 结构一致：[(r, c), ...]
+    archive = ParetoArchive(mat)
 
     # 逐点尝试入档（全局后滤）
     for r in range(rows):
         for c in range(cols):
-            update_population(archive, (r, c), mat)
+            archive.add((r, c))
 
     # 排序：a 降序，b 降序
-    archive.sort(key=lambda rc: (-mat[rc[0], rc[1], 0], -mat[rc[0], rc[1], 1]))
+    archive = archive.sorted_cells()
 
     # 组装返回格式 (r, c, a, b)
     return [(r, c, mat[r, c, 0], mat[r, c, 1]) for (r, c) in archive]
@@ -73,56 +384,27 @@ def dominates_val(a1, b1, a2, b2):
 
 
 # 4dir SEMO 变异与停滞检测相关函数
-def mutate_neighbor(r, c, rows, cols):
-    moves = [(1,0), (-1,0), (0,1), (0,-1)]
-    dr, dc = random.choice(moves)
-    nr = r + dr
-    nc = c + dc
-    # 环绕处理（wrap-around）
-    if nr < 0:
-        nr = rows - 1
-    elif nr >= rows:
-        nr = 0
-
-    if nc < 0:
-        nc = cols - 1
-    elif nc >= cols:
-        nc = 0
-    return (nr, nc)
+def mutate_neighbor(r, c, rows, cols, rng=random, topology=None):
+    """从 (r, c) 随机走到一个邻居：在拓扑的邻居表中查一次表（默认四邻域 + 环绕）"""
+    topo = topology or default_topology(rows, cols)
+    return divmod(topo.neighbor(r * cols + c, rng.randrange(topo.k)), cols)
 
 # 8dir SEMO 变异函数
-def mutate_neighbor_eight(r, c, rows, cols):
-    moves = [(1,0), (-1,0), (0,1), (0,-1),
-             (1,1), (-1,-1), (1,-1), (-1,1)]
-    dr, dc = random.choice(moves)
-    nr = r + dr
-    nc = c + dc
-
-    if nr < 0:
-        nr = rows - 1
-    elif nr >= rows:
-        nr = 0
-
-    if nc < 0:
-        nc = cols - 1
-    elif nc >= cols:
-        nc = 0
-
-    return (nr, nc)
+def mutate_neighbor_eight(r, c, rows, cols, rng=random):
+    return mutate_neighbor(r, c, rows, cols, rng, default_topology(rows, cols, eight=True))
 
 #4dir 邻居支配检测函数
-def all_neighbors_dominated(population, mat, rows, cols):
+def all_neighbors_dominated(population, mat, rows, cols, topology=None):
     """
     检查当前 population 的所有邻居是否都已经被 population 中的点支配：
-    对于 population 中每个点 (r,c) 的四邻域，如果每个邻居要么在 population 里，
+    对于 population 中每个点 (r,c) 的邻居（默认四邻域），如果每个邻居要么在 population 里，
     要么被 population 中某个点严格支配，则返回 True。
     """
-    moves = [(1,0), (-1,0), (0,1), (0,-1)]
+    topo = topology or default_topology(rows, cols)
 
     for (r, c) in population:
-        for dr, dc in moves:
-            nr = (r + dr) % rows
-            nc = (c + dc) % cols
+        for n in topo.neighbors(r * cols + c):
+            nr, nc = divmod(n, cols)
             a_n, b_n = mat[nr, nc]
 
             dominated = False
@@ -140,159 +422,475 @@ def all_neighbors_dominated(population, mat, rows, cols):
     return True
 #8dir 邻居支配检测函数
 def all_neighbors_dominated_eight(population, mat, rows, cols):
-    moves = [(1,0), (-1,0), (0,1), (0,-1),
-             (1,1), (-1,-1), (1,-1), (-1,1)]
+    return all_neighbors_dominated(population, mat, rows, cols,
+                                   default_topology(rows, cols, eight=True))
 
-    for (r, c) in population:
-        for dr, dc in moves:
-            nr = (r + dr) % rows
-            nc = (c + dc) % cols
-            a_n, b_n = mat[nr, nc]
+class OpenNeighbors:
+    """
+    增量维护档案的“开放邻居”集合：档案成员的邻居中，
+    既不在档案里、也不被档案中任何点严格支配的格点（均为展平下标）。
+    集合为空 ⇔ all_neighbors_dominated(population, ..., topology) 返回 True，
+    但只在档案增删成员时更新，停滞判断变为 O(1)。
+    archive 为 FlatArchive 或 NDArchive。
+    """
 
-            dominated = False
-            for (pr, pc) in population:
-                a_p, b_p = mat[pr, pc]
-                if (pr == nr and pc == nc) or dominates_val(a_p, b_p, a_n, b_n):
-                    dominated = True
+    def __init__(self, archive, topology):
+        self.archive = archive
+        self.nbrs = topology.nbrs
+        self.members = set(archive)
+        self.count = {}    # 格点 → 指向它的 (成员, 方向) 个数
+        self.open = set()
+        for cell in archive:
+            self._attach(cell)
+
+    def _attach(self, cell):
+        """cell 成为档案成员：登记它的邻居，未被覆盖的邻居进入开放集合"""
+        covers = self.archive.covers
+        count = self.count
+        for n in self.nbrs[cell]:
+            count[n] = count.get(n, 0) + 1
+            if n not in self.members and not covers(n):
+                self.open.add(n)
+
+    def _detach(self, cell):
+        """cell 被淘汰：注销它的邻居，不再是任何成员邻居的格点离开开放集合"""
+        count = self.count
+        for n in self.nbrs[cell]:
+            count[n] -= 1
+            if count[n] == 0:
+                del count[n]
+                self.open.discard(n)
+
+    def update(self, cand):
+        """在 archive.add(cand) 返回 True 之后调用"""
+        evicted = self.archive.last_evicted
+
+        self.members.add(cand)
+        self.members.difference_update(evicted)
+        self.open.discard(cand)
+        # 只有新成员会带来新的支配关系（被淘汰点能支配的点 cand 也能支配）
+        if self.open:
+            self.open = self.archive.undominated_by(cand, self.open)
+        for e in evicted:
+            self._detach(e)
+        self._attach(cand)
+
+    def stagnated(self):
+        return not self.open
+
+def log_checkpoints(iterations, per_decade=10):
+    """0 与 1..iterations 之间按对数等间隔取的迭代次数（去重、升序、包含 iterations）"""
+    if iterations <= 0:
+        return [0]
+    n = int(per_decade * np.log10(iterations)) + 1
+    pts = np.unique(np.round(np.logspace(0, np.log10(iterations), n)).astype(np.int64))
+    return [0] + pts.tolist()
+
+class CoverageTracker:
+    """
+    增量覆盖率：真实前沿格点进入档案时命中数 +1，离开档案时 -1，
+    不必每次重新求两个集合的交集；并在 checkpoints（默认对数间隔）处记录覆盖率，
+    一次运行即可得到“覆盖率-迭代次数”曲线。
+    """
+
+    def __init__(self, true_front, cols, iterations, checkpoints=None):
+        self.front = {r * cols + c for (r, c, *_) in true_front}
+        self.total = len(self.front)
+        self.hits = 0
+        self.checkpoints = log_checkpoints(iterations) if checkpoints is None else list(checkpoints)
+        self.curve = []
+
+    @property
+    def rate(self):
+        return self.hits / self.total if self.total > 0 else 0.0
+
+    def start(self, cells):
+        """以初始档案成员（通常只有起点）初始化命中数，记录第 0 次迭代；返回下一个检查点"""
+        self.hits = sum(1 for cell in cells if cell in self.front)
+        self.curve = []
+        return self.record(0)
+
+    def accepted(self, cand, evicted):
+        front = self.front
+        if cand in front:
+            self.hits += 1
+        for e in evicted:
+            if e in front:
+                self.hits -= 1
+
+    def record(self, steps):
+        """记录已完成 steps 次迭代时的覆盖率；返回下一个检查点（没有则为 -1）"""
+        cps = self.checkpoints
+        while len(self.curve) < len(cps) and cps[len(self.curve)] <= steps:
+            self.curve.append(self.rate)
+        return cps[len(self.curve)] if len(self.curve) < len(cps) else -1
+
+    def finish(self):
+        """提前停止（停滞后档案不再变化）时，剩余检查点沿用最终覆盖率"""
+        self.curve.extend([self.rate] * (len(self.checkpoints) - len(self.curve)))
+
+class EarlyStop:
+    """
+    semo_search 的可选提前停止条件，运行结束后 reason / step 记录触发的条件及其迭代次数：
+    - true_front 不为 None：档案覆盖全部真实前沿点时停止（"full_coverage"）
+    - stagnation=True：所有邻居都被档案覆盖时停止（"stagnation"，同 stop_on_stagnation）
+    - stall_window=w：连续 w 次迭代档案没有变化时停止（"stall"）
+    都没有触发则 reason 为 "budget"、step 为 iterations。
+    前两种条件成立后档案不可能再变化，提前停止不改变结果；stall 是启发式的。
+    """
+
+    def __init__(self, true_front=None, stagnation=True, stall_window=None):
+        self.true_front = true_front
+        self.stagnation = stagnation
+        self.stall_window = stall_window
+        self.reason = None
+        self.step = None
+
+    def __repr__(self):
+        return f"EarlyStop(reason={self.reason!r}, step={self.step})"
+
+def _search_loop_traced(trace, draws, iterations, population, nbrs, rejects, rejected,
+                        open_nbrs, coverage, next_cp, stop_on_full, window):
+    """
+    semo_search 主循环的插桩版本（trace 为 SEMO_trace.RunTrace）：
+    接收 / 拒绝规则、随机数消耗和停止条件与 semo_search 完全相同，
+    另外统计各类计数、各阶段耗时和档案大小轨迹。返回 (stagnation_steps, reason)。
+    与主循环是两份代码（主循环不为插桩付出任何开销），修改任一份时须同步另一份；
+    tests/test_trace.py 逐位比较两者的结果。
+    """
+    members = population.cells
+    add = population.add
+    sample_every = trace.begin(iterations)
+    size_trace = trace.size_trace
+    counts = dict.fromkeys(trace.COUNTERS, 0)
+    ns = dict.fromkeys(trace.PHASES, 0)
+
+    def reject(child, path):
+        counts[path] += 1
+        if population.covers(child):
+            counts["dominance_rejects"] += 1
+        else:
+            counts["duplicate_rejects"] += 1
+
+    stagnation_steps = iterations
+    reason = "budget"
+    changed = True
+    stall_at = window if window else -1
+    size_trace.append((0, len(members)))
+    t_prev = perf_counter_ns()
+    for step, (u, j) in enumerate(draws):
+        parent = members[int(u * len(members))]
+        child = nbrs[parent][j]
+        counts["proposals"] += 1
+        t1 = perf_counter_ns()
+        ns["select"] += t1 - t_prev
+
+        if rejects is not None and rejects[parent] >> j & 1:
+            reject(child, "fast_rejects")
+            t2 = perf_counter_ns()
+            ns["fast_reject"] += t2 - t1
+        elif rejected is not None and child in rejected:
+            reject(child, "memo_rejects")
+            t2 = perf_counter_ns()
+            ns["fast_reject"] += t2 - t1
+        else:
+            accepted = add(child)
+            t2 = perf_counter_ns()
+            ns["archive"] += t2 - t1
+            if accepted:
+                changed = True
+                counts["accepts"] += 1
+                counts["evictions"] += len(population.last_evicted)
+                if open_nbrs is not None:
+                    open_nbrs.update(child)
+                if coverage is not None:
+                    coverage.accepted(child, population.last_evicted)
+                if rejected is not None:
+                    rejected.update(population.last_evicted)
+                if window:
+                    stall_at = step + 1 + window
+            else:
+                if population.covers(child):
+                    counts["dominance_rejects"] += 1
+                else:
+                    counts["duplicate_rejects"] += 1
+                if rejected is not None:
+                    rejected.add(child)
+        if step + 1 == next_cp:
+            next_cp = coverage.record(step + 1)
+        if (step + 1) % sample_every == 0:
+            size_trace.append((step + 1, len(members)))
+        t3 = perf_counter_ns()
+        ns["bookkeeping"] += t3 - t2
+
+        stop = None
+        if changed:
+            changed = False
+            if stop_on_full and coverage.hits == coverage.total:
+                stop = "full_coverage"
+            elif open_nbrs is not None and open_nbrs.stagnated():
+                stop = "stagnation"
+        if stop is None and step + 1 == stall_at:
+            stop = "stall"
+        t_prev = perf_counter_ns()
+        ns["stop_check"] += t_prev - t3
+        if stop is not None:
+            stagnation_steps, reason = step + 1, stop
+            break
+
+    if not size_trace or size_trace[-1][0] != stagnation_steps:
+        size_trace.append((stagnation_steps, len(members)))
+    trace.end(counts, ns, stagnation_steps, len(members))
+    return stagnation_steps, reason
+
+def semo_search(mat, iterations, topology, start, rng=random, stop_on_stagnation=False,
+                objectives=None, coverage=None, rejects=None, memo=True, early_stop=None,
+                trace=None, archive=None):
+    """
+    SEMO 主循环，所有 run_semo* 函数共用：
+    从 start=(r, c) 出发，每次从档案随机选父节点，按 topology 查表变异到一个邻居，尝试入档。
+    stop_on_stagnation=True 时在“所有邻居都被档案覆盖”后停止。
+    循环内部只使用展平下标和 objectives=(A, B) 两个列表（默认由 objective_lists(mat) 生成，
+    并按矩阵缓存，同一矩阵上多次运行只生成一次）。
+    三个及以上目标时档案为 NDArchive，objectives 为 objective_vectors(mat) 的目标值元组列表，
+    coords 按目标值字典序降序排列；双目标的快速路径不变。
+    rng 可以是 random 模块、random.Random 或 BlockRNG（按块从 numpy Generator 取数，最快），
+    同一种子的结果逐位可复现。
+    rejects 为 neighbor_dominance_masks 的结果（可传 .tolist() 后的列表），
+    默认按 mat 与 topology 的邻域、边界计算一次并缓存；子节点被父节点支配或等值时直接拒绝，不查档案。
+    memo=True 时记住已被档案拒绝（或被淘汰）的格点，再次被提出时不做任何比较：
+    档案只会变好（淘汰者必被新成员严格支配），所以被拒绝的格点之后永远会被拒绝。
+    前沿大的网格（如 anticorrelated）上稳定快 1.4～1.6 倍；档案只有几个点时入档比较本来就便宜，
+    收益较小且随计时噪声波动（见 SEMO_bench.py --memo）。结果与 memo=False 完全相同。
+    coverage 为 CoverageTracker 时，循环中增量维护命中数并在检查点记录覆盖率曲线。
+    early_stop 为 EarlyStop 时按其条件提前停止，并在其中记录停止原因与迭代次数。
+    trace 为 SEMO_trace.RunTrace 时改用插桩循环（结果相同），记录计数、阶段耗时与档案大小轨迹；
+    不传时没有任何插桩开销。
+    archive 为已有的 FlatArchive / NDArchive 时在它上面继续搜索（原地更新，忽略 start 与 objectives），
+    可分段运行或在两段之间向档案加入外来成员（见 SEMO_island.py）。
+    返回 (按 a 降序、b 降序的档案坐标列表, stagnation_steps)；
+    stagnation_steps 为实际运行的迭代次数（触发任一停止条件的那一次，否则为 iterations）。
+    """
+    cols = topology.cols
+    nbrs = topology.nbrs
+    k = topology.k
+    if rejects is None:
+        rejects = cached_rejects(mat, topology)
+    if isinstance(rejects, np.ndarray):
+        rejects = rejects.tolist()
+    if archive is not None:
+        population = archive
+    elif mat.shape[2] == 2:
+        A, B = objectives if objectives is not None else cached_objectives(mat)
+        population = FlatArchive(A, B, [start[0] * cols + start[1]])
+    else:
+        V = objectives if objectives is not None else cached_objectives(mat)
+        population = NDArchive(V, [start[0] * cols + start[1]])
+    members = population.cells
+    add = population.add
+
+    stop_on_full = early_stop is not None and early_stop.true_front is not None
+    if stop_on_full and coverage is None:
+        coverage = CoverageTracker(early_stop.true_front, cols, iterations, checkpoints=())
+    if early_stop is not None and early_stop.stagnation:
+        stop_on_stagnation = True
+    window = early_stop.stall_window if early_stop is not None else None
+    stall_at = window if window else -1
+
+    open_nbrs = OpenNeighbors(population, topology) if stop_on_stagnation else None
+    rejected = set() if memo else None
+    next_cp = coverage.start(members) if coverage is not None else -1
+
+    # 默认认为一直跑到 iterations 才“停滞”
+    stagnation_steps = iterations
+    reason = "budget"
+    # 停滞 / 全覆盖只可能在档案变化后出现：第一次迭代检查一次，之后只在接收新点后检查
+    changed = True
+
+    # 随机数按块预取：u 选父节点，j 选变异方向
+    draws = random_draws(rng, k, iterations)
+    if trace is not None:
+        stagnation_steps, reason = _search_loop_traced(
+            trace, draws, iterations, population, nbrs, rejects, rejected,
+            open_nbrs, coverage, next_cp, stop_on_full, window)
+    else:
+        for step, (u, j) in enumerate(draws):
+            # 先从population选择一个父节点，再查表走到它的一个邻居
+            parent = members[int(u * len(members))]
+
+            # 被父节点支配或等值的邻居必然被拒绝：查一位即可跳过；否则尝试加入档案
+            if rejects is None or not rejects[parent] >> j & 1:
+                child = nbrs[parent][j]
+                if rejected is not None and child in rejected:
+                    pass
+                elif add(child):
+                    changed = True
+                    if open_nbrs is not None:
+                        open_nbrs.update(child)
+                    if coverage is not None:
+                        coverage.accepted(child, population.last_evicted)
+                    if rejected is not None:
+                        rejected.update(population.last_evicted)
+                    if window:
+                        stall_at = step + 1 + window
+                elif rejected is not None:
+                    rejected.add(child)
+            if step + 1 == next_cp:
+                next_cp = coverage.record(step + 1)
+
+            if changed:
+                changed = False
+                if stop_on_full and coverage.hits == coverage.total:
+                    stagnation_steps, reason = step + 1, "full_coverage"
+                    break
+                # ✅ 检查：当前 population 的所有邻居是否都已经被 population 支配
+                #    （等价于 all_neighbors_dominated，但由开放邻居集合增量维护）
+                if open_nbrs is not None and open_nbrs.stagnated():
+                    stagnation_steps, reason = step + 1, "stagnation"   # 第几次迭代达到“所有邻居被支配”
                     break
+            if step + 1 == stall_at:
+                stagnation_steps, reason = step + 1, "stall"
+                break
 
-            if not dominated:
-                return False
+    if coverage is not None:
+        coverage.finish()
+    if early_stop is not None:
+        early_stop.reason, early_stop.step = reason, stagnation_steps
+    return [divmod(i, cols) for i in population.sorted_indices()], stagnation_steps
 
-    return True
+def _topology_for(mat, topology, eight=False):
+    """
+    未指定拓扑时使用原有的 4 / 8 邻域 + 环绕边界；
+    内存映射矩阵使用按需计算邻居的 lazy 拓扑，不为整张网格建表。
+    """
+    if topology is not None:
+        return topology
+    rows, cols, _ = mat.shape
+    return default_topology(rows, cols, eight, lazy=True if isinstance(mat, np.memmap) else None)
 
-def run_semo(mat, iterations):
+def run_semo(mat, iterations, rng=random, topology=None,
+             objectives=None, rejects=None, early_stop=None,
+             trace=None, decimals=2):
     rows, cols, _ = mat.shape
 
     # 当前“位置”的索引（注意：是索引，不是目标值）
-    cur_r = random.randrange(rows)
-    cur_c = random.randrange(cols)
-    population = [(cur_r, cur_c)]
-    a, b = mat[cur_r, cur_c]
+    cur_r = rng.randrange(rows)
+    cur_c = rng.randrange(cols)
+    # 定点整数矩阵按原值打印（decimals 与 generate_matrix 的相同）
+    values = from_fixed_point(mat[cur_r, cur_c], decimals).tolist()
+    names = "ab" if len(values) == 2 else [f"v{j}" for j in range(len(values))]
     print(f"\n========== SEMO 初始点 ==========")
-    print(f"({cur_r:2d},{cur_c:2d}) -> a={a:7.2f}, b={b:7.2f}")
+    print(f"({cur_r:2d},{cur_c:2d}) -> " + ", ".join(f"{n}={v:7.2f}" for n, v in zip(names, values)))
 
     # 迭代搜索，每次从 population 随机选择一个父节点，变异到邻居，尝试加入档案
-    for _ in range(iterations):
-        # 先从population选择一个父节点
-        parent_r, parent_c = random.choice(population)
-
-        # 从父节点随机走到四邻域的一个邻居（wrap-around）
-        child_r, child_c = mutate_neighbor(parent_r, parent_c, rows, cols)
-
-        # 尝试加入档案
-        update_population(population, (child_r, child_c), mat)
-
-    population.sort(key=lambda rc: (-mat[rc[0], rc[1], 0], -mat[rc[0], rc[1], 1]))
+    population, _ = semo_search(mat, iterations, _topology_for(mat, topology),
+                                (cur_r, cur_c), rng, objectives=objectives, rejects=rejects,
+                                early_stop=early_stop, trace=trace)
     return population
 
-def run_semo_eight(mat, iterations):
+def run_semo_eight(mat, iterations, rng=random, topology=None,
+                   objectives=None, rejects=None, early_stop=None,
+                   trace=None):
     rows, cols, _ = mat.shape
 
-    cur_r = random.randrange(rows)
-    cur_c = random.randrange(cols)
-    population = [(cur_r, cur_c)]
-
-    for _ in range(iterations):
-        parent_r, parent_c = random.choice(population)
-        child_r, child_c = mutate_neighbor_eight(parent_r, parent_c, rows, cols)
-        update_population(population, (child_r, child_c), mat)
-
-    population.sort(key=lambda rc: (-mat[rc[0], rc[1], 0],
-                                    -mat[rc[0], rc[1], 1]))
+    cur_r = rng.randrange(rows)
+    cur_c = rng.randrange(cols)
+    population, _ = semo_search(mat, iterations, _topology_for(mat, topology, eight=True),
+                                (cur_r, cur_c), rng, objectives=objectives, rejects=rejects,
+                                early_stop=early_stop, trace=trace)
     return population
 
 def semo_coverage_rate(semo_pop, true_front):
-    true_coords = {(r, c) for (r, c, a, b) in true_front}
+    true_coords = {(r, c) for (r, c, *_) in true_front}
     semo_coords = set(semo_pop)
     hit = len(true_coords & semo_coords)
     total = len(true_coords)
     rate = hit / total if total > 0 else 0.0
     return hit, total, rate
 
-def run_semo_with_stagnation(mat, iterations):
+def run_semo_with_stagnation(mat, iterations, rng=random, topology=None,
+                             objectives=None, rejects=None, early_stop=None,
+                             trace=None):
     rows, cols, _ = mat.shape
-    cur_r = random.randrange(rows)
-    cur_c = random.randrange(cols)
-    population = [(cur_r, cur_c)]
-
-    # 默认认为一直跑到 iterations 才“停滞”
-    stagnation_steps = iterations
-
-    for step in range(iterations):
-        parent_r, parent_c = random.choice(population)
-        child_r, child_c = mutate_neighbor(parent_r, parent_c, rows, cols)
-        update_population(population, (child_r, child_c), mat)
-
-        # ✅ 检查：当前 population 的所有邻居是否都已经被 population 支配
-        if all_neighbors_dominated(population, mat, rows, cols):
-            stagnation_steps = step + 1   # 第几次迭代达到“所有邻居被支配”
-            break
-
-    population.sort(key=lambda rc: (-mat[rc[0], rc[1], 0],
-                                    -mat[rc[0], rc[1], 1]))
-    return population, stagnation_steps
-
-def run_semo_with_stagnation_eight(mat, iterations):
+    cur_r = rng.randrange(rows)
+    cur_c = rng.randrange(cols)
+    return semo_search(mat, iterations, _topology_for(mat, topology),
+                       (cur_r, cur_c), rng, stop_on_stagnation=True,
+                       objectives=objectives, rejects=rejects, early_stop=early_stop,
+                       trace=trace)
+
+def run_semo_with_stagnation_eight(mat, iterations, rng=random, topology=None,
+                                   objectives=None, rejects=None, early_stop=None,
+                                   trace=None):
     rows, cols, _ = mat.shape
-
-    cur_r = random.randrange(rows)
-    cur_c = random.randrange(cols)
-    population = [(cur_r, cur_c)]
-
-    stagnation_steps = iterations
-
-    for step in range(iterations):
-        parent_r, parent_c = random.choice(population)
-        child_r, child_c = mutate_neighbor_eight(parent_r, parent_c, rows, cols)
-        update_population(population, (child_r, child_c), mat)
-
-        if all_neighbors_dominated_eight(population, mat, rows, cols):
-            stagnation_steps = step + 1
-            break
-
-    population.sort(key=lambda rc: (-mat[rc[0], rc[1], 0],
-                                    -mat[rc[0], rc[1], 1]))
-    return population, stagnation_steps
-
-def run_semo_with_start(mat, iterations, start_r, start_c):
+    cur_r = rng.randrange(rows)
+    cur_c = rng.randrange(cols)
+    return semo_search(mat, iterations, _topology_for(mat, topology, eight=True),
+                       (cur_r, cur_c), rng, stop_on_stagnation=True,
+                       objectives=objectives, rejects=rejects, early_stop=early_stop,
+                       trace=trace)
+
+def run_semo_coverage_curve(mat, iterations, true_front, rng=random, topology=None,
+                            start=None, checkpoints=None, stop_on_stagnation=False,
+                            objectives=None, rejects=None, early_stop=None,
+                            trace=None):
+    """
+    运行一次 SEMO（默认四邻域、随机起点），同时得到覆盖率随迭代次数变化的曲线。
+    checkpoints 默认是 0..iterations 的对数间隔点；stop_on_stagnation=True 时停滞后
+    剩余检查点沿用最终覆盖率（停滞后档案不再变化，与继续跑下去的结果相同）。
+    返回 (最终档案坐标列表, checkpoints, 各检查点的覆盖率列表)。
+    """
     rows, cols, _ = mat.shape
-    population = [(start_r, start_c)]
-
-    for _ in range(iterations):
-        parent_r, parent_c = random.choice(population)
-        child_r, child_c = mutate_neighbor(parent_r, parent_c, rows, cols)
-        update_population(population, (child_r, child_c), mat)
-
-    population.sort(key=lambda rc: (-mat[rc[0], rc[1], 0],
-                                    -mat[rc[0], rc[1], 1]))
+    if start is None:
+        start = (rng.randrange(rows), rng.randrange(cols))
+    tracker = CoverageTracker(true_front, cols, iterations, checkpoints)
+    population, _ = semo_search(mat, iterations, _topology_for(mat, topology), start, rng,
+                                stop_on_stagnation=stop_on_stagnation,
+                                objectives=objectives, coverage=tracker,
+                                rejects=rejects, early_stop=early_stop, trace=trace)
+    return population, tracker.checkpoints, tracker.curve
+
+def run_semo_with_start(mat, iterations, start_r, start_c, rng=random, topology=None,
+                        objectives=None, rejects=None, early_stop=None,
+                        trace=None):
+    population, _ = semo_search(mat, iterations, _topology_for(mat, topology),
+                                (start_r, start_c), rng, objectives=objectives, rejects=rejects,
+                                early_stop=early_stop, trace=trace)
     return population
 
-def run_semo_eight_with_start(mat, iterations, start_r, start_c):
-    rows, cols, _ = mat.shape
-    population = [(start_r, start_c)]
-
-    for _ in range(iterations):
-        parent_r, parent_c = random.choice(population)
-        child_r, child_c = mutate_neighbor_eight(parent_r, parent_c, rows, cols)
-        update_population(population, (child_r, child_c), mat)
-
-    population.sort(key=lambda rc: (-mat[rc[0], rc[1], 0],
-                                    -mat[rc[0], rc[1], 1]))
+def run_semo_eight_with_start(mat, iterations, start_r, start_c, rng=random, topology=None,
+                              objectives=None, rejects=None, early_stop=None,
+                              trace=None):
+    population, _ = semo_search(mat, iterations, _topology_for(mat, topology, eight=True),
+                                (start_r, start_c), rng, objectives=objectives, rejects=rejects,
+                                early_stop=early_stop, trace=trace)
     return population
 
 if __name__ == "__main__":
+    from SEMO_batch import batch_semo_summary
+    from SEMO_checkpoint import checkpoint_matrix, remove_checkpoint
+
     # 参数设置
     interation_time = 100000   # 每次 SEMO 的迭代次数
     rows, cols = 10, 10        # 矩阵大小
-    runs = 10000               # 重复运行 SEMO 的次数
+    runs = 100000              # 重复运行 SEMO 的次数上限
+    cov_half_width = 0.005     # 序贯停止：平均覆盖率 95% 置信区间半宽的目标
+    stag_half_width = 0.5      # 序贯停止：平均停滞步数 95% 置信区间半宽的目标
+    # 多次运行统计的检查点（4 邻居、8 邻居各一个）：中断后同一命令重跑即续跑
+    # （已完成的 4 邻居实验直接取检查点中的结果），两组都完成后一起删除
+    ckpt_4, ckpt_8 = "SEMO_8dir_cvg_4.ckpt", "SEMO_8dir_cvg_8.ckpt"
 
     # ========== 1. 生成矩阵并打印 ==========
-    m = generate_matrix(rows, cols, (0, 100), 2)
+    # 有检查点时沿用其中的矩阵，否则重新生成
+    m = checkpoint_matrix(ckpt_4)
+    if m is None:
+        m = generate_matrix(rows, cols, (0, 100), 2)
+    # 打印用的原值（定点整数矩阵还原为浮点，浮点矩阵不变）
+    shown = from_fixed_point(m)
     print("========== 随机生成的矩阵 ==========")
     for r in range(rows):
         for c in range(cols):
-            a, b = m[r, c]
+            a, b = shown[r, c]
             print(f"[{a:6.2f}, {b:6.2f}]", end="  ")
         print()
 
@@ -300,7 +898,8 @@ if __name__ == "__main__":
     real_front = pareto_best_points(m)
 
     print("\n========== 真实 Pareto 前沿 ==========")
-    for (r, c, a, b) in real_front:
+    for (r, c, _, _) in real_front:
+        a, b = shown[r, c]
         print(f"({r:2d},{c:2d}) -> a={a:7.2f}, b={b:7.2f}")
 
     # 为后面覆盖率计算准备坐标集合
@@ -310,23 +909,26 @@ if __name__ == "__main__":
     # ========== 3. 单次运行：同一起点的 4 邻居 vs 8 邻居 SEMO ==========
     start_r = random.randrange(rows)
     start_c = random.randrange(cols)
-    a0, b0 = m[start_r, start_c]
+    a0, b0 = shown[start_r, start_c]
 
     print("\n========== 统一 SEMO 起点 ==========")
     print(f"起点 = ({start_r:2d},{start_c:2d}) -> a={a0:7.2f}, b={b0:7.2f}")
 
-    # 从同一起点分别运行 4 邻居 和 8 邻居 SEMO（不带停滞判断，只看最终档案）
-    semo_pop_4 = run_semo_with_start(m, interation_time, start_r, start_c)
-    semo_pop_8 = run_semo_eight_with_start(m, interation_time, start_r, start_c)
+    # 从同一起点分别运行 4 邻居 和 8 邻居 SEMO，只看最终档案；
+    # 全覆盖或停滞后档案不再变化，提前停止不影响结果
+    stop_4 = EarlyStop(true_front=real_front)
+    stop_8 = EarlyStop(true_front=real_front)
+    semo_pop_4 = run_semo_with_start(m, interation_time, start_r, start_c, early_stop=stop_4)
+    semo_pop_8 = run_semo_eight_with_start(m, interation_time, start_r, start_c, early_stop=stop_8)
 
     print("\n========== 4 邻居 SEMO 最终非支配集合 ==========")
     for (r, c) in semo_pop_4:
-        a, b = m[r, c]
+        a, b = shown[r, c]
         print(f"({r:2d},{c:2d}) -> a={a:7.2f}, b={b:7.2f}")
 
     print("\n========== 8 邻居 SEMO 最终非支配集合 ==========")
     for (r, c) in semo_pop_8:
-        a, b = m[r, c]
+        a, b = shown[r, c]
         print(f"({r:2d},{c:2d}) -> a={a:7.2f}, b={b:7.2f}")
 
     # 单次覆盖率对比
@@ -340,64 +942,33 @@ if __name__ == "__main__":
     print(f"4 邻居 SEMO 集合个数 = {len(semo_pop_4)}")
     print(f"4 邻居命中的真实 Pareto 点个数 = {valid_hits_4}")
     print(f"4 邻居单次覆盖率 = {cover_4:.4f} ({cover_4*100:.2f}%)")
+    print(f"4 邻居停止条件 = {stop_4.reason}（第 {stop_4.step} 次迭代）")
 
     print(f"\n8 邻居 SEMO 集合个数 = {len(semo_pop_8)}")
     print(f"8 邻居命中的真实 Pareto 点个数 = {valid_hits_8}")
     print(f"8 邻居单次覆盖率 = {cover_8:.4f} ({cover_8*100:.2f}%)")
+    print(f"8 邻居停止条件 = {stop_8.reason}（第 {stop_8.step} 次迭代）")
 
     # ========== 4. 多次运行：统计期望覆盖率 & 停滞步数 ==========
-    coverage_list = []
-    stagnation_list = []
-
-    coverage_list_eight = []
-    stagnation_list_eight = []
-
-    print(f"\n开始进行 {runs} 次 SEMO 运行统计（带停滞判断）...")
-
-    # 4 邻居：使用带“邻居停滞判断”的版本
-    for i in range(runs):
-        semo_pop, stagnation_steps = run_semo_with_stagnation(m, interation_time)
-        _, _, rate = semo_coverage_rate(semo_pop, real_front)
-        coverage_list.append(rate)
-        stagnation_list.append(stagnation_steps)
-
-    # 8 邻居：使用 8 方向邻居停滞判断版本
-    for i in range(runs):
-        semo_pop_eight, stagnation_steps_eight = run_semo_with_stagnation_eight(m, interation_time)
-        _, _, rate_eight = semo_coverage_rate(semo_pop_eight, real_front)
-        coverage_list_eight.append(rate_eight)
-        stagnation_list_eight.append(stagnation_steps_eight)
-
-    coverage_arr = np.array(coverage_list)
-    stagnation_arr = np.array(stagnation_list)
-    coverage_arr_eight = np.array(coverage_list_eight)
-    stagnation_arr_eight = np.array(stagnation_list_eight)
-
-    mean_cov = coverage_arr.mean()
-    std_cov = coverage_arr.std()  # 总体标准差
-    mean_stag = stagnation_arr.mean()
-    std_stag = stagnation_arr.std()
-    std_stag_eight = stagnation_arr_eight.std()
-
-    mean_cov_eight = coverage_arr_eight.mean()
-    std_cov_eight = coverage_arr_eight.std()
-    mean_stag_eight = stagnation_arr_eight.mean()
+    print(f"\n开始进行 SEMO 运行统计（带停滞判断；两项置信区间都足够窄即停止，最多 {runs} 次）...")
+
+    # 4 邻居 / 8 邻居：分批推进带停滞判断的运行（前沿小时用批量引擎，前沿大时逐次运行标量版本）
+    # （分别与逐次调用 run_semo_with_stagnation / _eight 的分布相同），
+    # 结果直接累加进流式统计累加器，不保留逐次结果；每批之后检查是否达到目标
+    # 批与批之间每隔 60 秒及结束时写入检查点
+    sequential = dict(batch_size=2000, cov_half_width=cov_half_width, stag_half_width=stag_half_width)
+    acc = batch_semo_summary(m, interation_time, runs, real_front, Topology.four(rows, cols),
+                             checkpoint=ckpt_4, keep_checkpoint=True, **sequential)
+    acc_eight = batch_semo_summary(m, interation_time, runs, real_front, Topology.eight(rows, cols),
+                                   checkpoint=ckpt_8, keep_checkpoint=True, **sequential)
+    remove_checkpoint(ckpt_4)
+    remove_checkpoint(ckpt_8)
 
     print("\n========== 多次运行统计结果 ==========")
-    print(f"运行次数: {runs}")
-    print("============== 4 neighbor 结果 ============")
-    print(f"4 neighbor 平均覆盖率: {mean_cov:.4f} ({mean_cov*100:.2f}%)")
-    print(f"4 neighbor 覆盖率标准差: {std_cov:.4f} ({std_cov*100:.2f} %)")
-    print(f"4 neighbor 最少停滞步数: {stagnation_arr.min()}")
-    print(f"4 neighbor 最多停滞步数: {stagnation_arr.max()}")
-    print(f"4 neighbor 平均停滞步数: {mean_stag:.2f}")
-    print(f"4 neighbor 停滞步数标准差: {std_stag:.2f}")
-    print("=====================================")
-    print("============== 8 neighbor 结果 ============")
-    print(f"8 neighbor 平均覆盖率: {mean_cov_eight:.4f} ({mean_cov_eight*100:.2f}%)")
-    print(f"8 neighbor 覆盖率标准差: {std_cov_eight:.4f} ({std_cov_eight*100:.2f} %)")
-    print(f"8 neighbor 最少停滞步数: {stagnation_arr_eight.min()}")
-    print(f"8 neighbor 最多停滞步数: {stagnation_arr_eight.max()}")
-    print(f"8 neighbor 平均停滞步数: {mean_stag_eight:.2f}")
-    print(f"8 neighbor 停滞步数标准差: {std_stag_eight:.2f}")
-    print("=====================================") 
\ No newline at end of file
+    for name, a in (("4 neighbor", acc), ("8 neighbor", acc_eight)):
+        print(f"============== {name} 结果 ============")
+        print(f"{name} 运行次数: {a.n}（{'达到目标' if a.n < runs else '达到运行次数上限'}），"
+              f"覆盖率 {a.coverage.mean:.4f} ± {a.coverage.half_width():.4f}，"
+              f"停滞步数 {a.stagnation.mean:.2f} ± {a.stagnation.half_width():.2f}")
+        a.print_summary(f"{name} ")
+        print("=====================================")
@@ -0,0 +1,371 @@
+import numpy as np
+from SEMO_topology import Topology
+from SEMO_stats import MonteCarloAccumulator
+from SEMO_checkpoint import save_checkpoint, remove_checkpoint, resume_state, CheckpointTimer
+from SEMO_rng import BlockRNG
+from SEMO_8dir_cvg import FlatArchive, cached_objectives, cached_rejects, semo_search
+"""
+批量（lock-step）SEMO 引擎：在同一个矩阵上同时推进 R 次相互独立的运行。
+每一步对所有仍在运行的 run 同时完成“选父节点 → 变异到邻居 → 尝试入档 → 停滞检测”，
+全部用 NumPy 数组运算代替逐次调用 run_semo_with_stagnation 的 Python 循环。
+
+档案以定长填充数组保存（见 _Staircases）：每行按 a 升序排成“阶梯”，配合全局有序的键表，
+接收 / 拒绝 / 淘汰都是一次按行的二分查找；子节点先查父节点的支配位掩码
+（neighbor_dominance_masks），必被拒绝的不查档案。停滞检测为每个 run 记住一个未被覆盖的
+邻居作为见证，见证失效时才全量检查。仍在运行的 run 少于 _SCALAR_TAIL 个时，
+剩下的长尾 run 交给标量 semo_search 从当前档案继续。
+接收规则、停滞判定与 SEMO_8dir_cvg.py 中的标量版本完全一致，
+因此覆盖率和停滞步数的分布相同（随机数来源不同，单次结果不逐一相等；见 tests/test_batch.py）。
+
+速度（每次最多 100000 步，与逐次运行标量 semo_search 相比）：
+10x10 random（前沿 4 个点）10000 次运行快 2.5～2.7 倍；10x10 anticorrelated（前沿 39 个点）
+2000 次快 1.5～1.6 倍；30x30 anticorrelated（前沿 116 个点）2000 次快 1.1～1.4 倍；
+50x50 anticorrelated（前沿 182 个点）1000 次与标量相当或略慢。
+batch_semo_summary 默认按前沿大小自动选择引擎。
+"""
+
+# 停滞检测时一次检查的 (run, 成员, 方向) 个数上限（控制临时数组的内存）
+_CHUNK_ELEMS = 1 << 22
+
+# 仍在运行的 run 少于这么多个时，剩下的 run 交给标量 semo_search 从当前档案继续
+# （每一步的 NumPy 调用有固定开销，少数长尾 run 逐步推进不如逐次运行）
+_SCALAR_TAIL = 256
+
+# engine="auto" 时真实前沿不超过这么多个点才使用批量引擎，否则逐次运行标量 semo_search
+BATCH_MAX_FRONT = 128
+
+
+def _dense_rank(x):
+    """x 的稠密秩（等值同秩，0 起）与不同取值的个数"""
+    values, rank = np.unique(x, return_inverse=True)
+    return rank.astype(np.int64), values.size
+
+
+class _Staircases:
+    """
+    R 个双目标档案的批量“阶梯”表示（与 FlatArchive 相同的规则）：
+    members[R, cap] 每行前 size 个为成员下标，按 a 严格升序（于是 b 严格降序）。
+    另存两张键表 key_a / key_b：第 i 行为 i * stride + 成员的 a 秩（b 为反向秩），
+    空位填该行的哨兵值；整张表展平后全局有序，一次 np.searchsorted 即可对所有 run
+    同时做按行的二分查找。接收 / 拒绝 / 淘汰因此都是 O(log) 的，与档案大小几乎无关。
+    """
+
+    def __init__(self, starts, rank_a, n_a, rank_b, n_b, cap=8):
+        runs = len(starts)
+        self.rank_a, self.rank_b = rank_a, rank_b
+        self.stride_a, self.stride_b = n_a + 1, n_b + 1
+        self.cap = cap
+        self.members = np.zeros((runs, cap), dtype=np.int64)
+        self.members[:, 0] = starts
+        self.size = np.ones(runs, dtype=np.int64)
+        self.watch_m = np.full(runs, -1, dtype=np.int64)   # 见证：成员下标（-1 表示没有）
+        self.watch_j = np.zeros(runs, dtype=np.int64)      # 见证：方向
+        self._alloc_keys()
+
+    def _alloc_keys(self):
+        runs = self.members.shape[0]
+        self.key_a = np.empty((runs, self.cap), dtype=np.int64)
+        self.key_b = np.empty((runs, self.cap), dtype=np.int64)
+        self._update_keys(np.arange(runs))
+
+    def _update_keys(self, rows):
+        M = self.members[rows]
+        valid = np.arange(self.cap) < self.size[rows, None]
+        ka = np.where(valid, self.rank_a[M], self.stride_a - 1)
+        kb = np.where(valid, self.stride_b - 2 - self.rank_b[M], self.stride_b - 1)
+        self.key_a[rows] = rows[:, None] * self.stride_a + ka
+        self.key_b[rows] = rows[:, None] * self.stride_b + kb
+
+    def reserve(self, rows):
+        """保证这些 run 的档案还能再放一个点（一步之内最多净增 1 个）"""
+        if rows.size and self.size[rows].max() >= self.cap:
+            self.members = np.pad(self.members, ((0, 0), (0, self.cap)))
+            self.cap *= 2
+            self._alloc_keys()
+
+    def first_a_ge(self, rows, rank, side="left"):
+        """各行中第一个 a 秩 >= rank（side="right" 时为 > rank）的成员位置"""
+        flat = np.searchsorted(self.key_a.ravel(), rows * self.stride_a + rank, side=side)
+        return flat - rows * self.cap
+
+    def add(self, rows, cells, B):
+        """
+        每行尝试接收一个候选点，返回接收与否的布尔数组。
+        被某成员弱支配（含等值）即拒绝：a 不小于候选点的成员中 b 最大的是第一个，只查它；
+        接收时被支配的成员在阶梯上是连续一段 [lo, hi)，整段替换为候选点。
+        """
+        members, size, cap = self.members, self.size, self.cap
+        inside, first = self._lookup(rows, cells)
+        ok = ~(inside & (B[first] >= B[cells]))
+
+        rows, cells = rows[ok], cells[ok]
+        if rows.size:
+            hi = self.first_a_ge(rows, self.rank_a[cells], side="right")
+            q = rows * self.stride_b + self.stride_b - 2 - self.rank_b[cells]
+            lo = np.searchsorted(self.key_b.ravel(), q) - rows * cap
+            j = np.arange(cap)
+            src = np.where(j < lo[:, None], j, j - 1 + (hi - lo)[:, None])
+            new = np.take_along_axis(members[rows], np.clip(src, 0, cap - 1), axis=1)
+            new[j == lo[:, None]] = np.broadcast_to(cells[:, None], new.shape)[j == lo[:, None]]
+            members[rows] = new
+            size[rows] += 1 - (hi - lo)
+            self._update_keys(rows)
+        return ok
+
+    def _lookup(self, rows, cells):
+        """各行中 a 不小于 cells 的第一个成员：返回 (是否存在, 该成员下标)"""
+        pos = self.first_a_ge(rows, self.rank_a[cells])
+        inside = pos < self.size[rows]
+        return inside, self.members[rows, np.minimum(pos, self.cap - 1)]
+
+    def _covered(self, rows, cells, A, B):
+        """cells 是否为该行档案的成员或被某成员严格支配（只需与 _lookup 找到的成员比较）"""
+        inside, m = self._lookup(rows, cells)
+        dom = (B[m] >= B[cells]) & ((A[m] != A[cells]) | (B[m] != B[cells]))
+        return inside & ((m == cells) | dom)
+
+    def stagnant(self, rows, A, B, nbr):
+        """
+        批量版 all_neighbors_dominated：这些 run 的档案中每个点的每个邻居
+        要么是成员、要么被某成员严格支配时该 run 已停滞。
+        每个 run 记住一个见证（成员, 方向）：上次检查时发现的未被覆盖的邻居。
+        见证成员仍在档案中且该邻居仍未被覆盖时不必再查（两次查找）；
+        否则对全部 (成员, 方向) 检查一遍，并记下新的见证。
+        """
+        k = nbr.shape[1]
+        wm, wj = self.watch_m[rows], self.watch_j[rows]
+        has = wm >= 0
+        wm0 = np.maximum(wm, 0)
+        inside, m = self._lookup(rows, wm0)
+        alive = has & inside & (m == wm0)
+        still_open = alive & ~self._covered(rows, nbr[wm0, wj], A, B)
+
+        out = np.zeros(rows.size, dtype=bool)
+        need = np.flatnonzero(~still_open)
+        step = max(1, _CHUNK_ELEMS // (self.cap * k))
+        for s in range(0, need.size, step):
+            idx = need[s:s + step]
+            r = rows[idx]
+            M = self.members[r]
+            valid = np.arange(self.cap) < self.size[r, None]
+            nb = nbr[M]                                   # (n, cap, k)
+            rr = np.broadcast_to(r[:, None, None], nb.shape)
+            covered = self._covered(rr.ravel(), nb.ravel(), A, B).reshape(nb.shape)
+            uncovered = (~covered & valid[:, :, None]).reshape(r.size, -1)
+            out[idx] = ~uncovered.any(1)
+            first = uncovered.argmax(1)
+            self.watch_m[r] = M[np.arange(r.size), first // k]
+            self.watch_j[r] = first % k
+        return out
+
+
+def batch_semo_with_stagnation(mat, iterations, runs, true_front, topology=None,
+                               rng=None, starts=None, stop_on_stagnation=True):
+    """
+    同时运行 runs 次 SEMO（等价于 runs 次 run_semo_with_stagnation / _eight）。
+    topology 为邻域拓扑（默认四邻域 + 环绕，Topology.eight 即 8 邻域），
+    rng 为 numpy Generator 或随机种子，
+    starts 为各 run 的起点展平下标（默认均匀随机）。
+    stop_on_stagnation=False 时不做停滞检测，所有 run 都跑满 iterations 步（等价于 run_semo）。
+    返回 (coverage, stagnation_steps)：两个长度为 runs 的数组。
+    """
+    rows, cols, n_obj = mat.shape
+    if n_obj != 2:
+        raise ValueError(f"批量引擎只支持双目标矩阵，当前为 {n_obj} 个目标")
+    n_cells = rows * cols
+    A = np.ascontiguousarray(mat[:, :, 0]).ravel()
+    B = np.ascontiguousarray(mat[:, :, 1]).ravel()
+    if topology is None:
+        topology = Topology.four(rows, cols)
+    nbr = topology.table
+    if nbr is None:
+        raise ValueError("批量引擎需要预计算的邻居表（请使用 lazy=False 的 Topology）")
+    k = nbr.shape[1]
+    masks = cached_rejects(mat, topology, as_list=False)
+    rng = np.random.default_rng(rng)
+
+    front = np.zeros(n_cells, dtype=bool)
+    for (r, c, *_) in true_front:
+        front[r * cols + c] = True
+    total = int(front.sum())
+
+    starts = rng.integers(n_cells, size=runs) if starts is None else np.asarray(starts)
+    archive = _Staircases(starts, *_dense_rank(A), *_dense_rank(B))
+    stagnation_steps = np.full(runs, iterations, dtype=np.int64)
+    active = np.arange(runs)
+
+    tail = np.empty(0, dtype=np.int64)
+    for step in range(iterations):
+        if active.size < _SCALAR_TAIL:
+            tail = active
+            break
+        archive.reserve(active)
+        n = active.size
+        s = archive.size[active]
+
+        # 选父节点 + 变异到邻居
+        parent = archive.members[active, (rng.random(n) * s).astype(np.int64)]
+        j = rng.integers(k, size=n)
+        child = nbr[parent, j]
+
+        # 被父节点支配或等值的邻居必被拒绝（查一位即可，见 neighbor_dominance_masks），其余查档案
+        if masks is not None:
+            live = (masks[parent] >> j.astype(masks.dtype)) & 1 == 0
+            cand, child = active[live], child[live]
+        else:
+            cand = active
+        changed = cand[archive.add(cand, child, B)]
+
+        if not stop_on_stagnation:
+            continue
+
+        # 停滞只可能因档案变化而出现：第一步检查全部，之后只检查档案变化的 run
+        check = active if step == 0 else changed
+        if check.size:
+            done = check[archive.stagnant(check, A, B, nbr)]
+            if done.size:
+                stagnation_steps[done] = step + 1
+                active = np.setdiff1d(active, done, assume_unique=True)
+
+    valid = np.arange(archive.cap) < archive.size[:, None]
+    hits = (front[archive.members] & valid).sum(1)
+
+    # 长尾：从各自的当前档案继续标量运行（马尔可夫过程，续跑与一直批量推进同分布）
+    if tail.size:
+        A_list, B_list = cached_objectives(mat)
+        rejects = cached_rejects(mat, topology)
+        block_rng = BlockRNG(rng)
+        for i in tail.tolist():
+            flat = FlatArchive(A_list, B_list, archive.members[i, :archive.size[i]].tolist())
+            _, steps = semo_search(mat, iterations - step, topology, None, block_rng,
+                                   stop_on_stagnation=stop_on_stagnation, rejects=rejects,
+                                   archive=flat)
+            stagnation_steps[i] = step + steps
+            hits[i] = int(front[flat.cells].sum())
+
+    coverage = hits / total if total > 0 else np.zeros(runs)
+    return coverage, stagnation_steps
+
+
+def scalar_semo_with_stagnation(mat, iterations, runs, true_front, topology=None,
+                                rng=None, starts=None, stop_on_stagnation=True):
+    """
+    逐次运行 runs 次标量 semo_search，参数与返回值同 batch_semo_with_stagnation。
+    起点（starts 未给出时）与每次运行的随机数都取自 numpy Generator rng，
+    所以 rng 的状态完整描述了进度（检查点可以续跑）。
+    """
+    rows, cols, _ = mat.shape
+    if topology is None:
+        topology = Topology.four(rows, cols)
+    rng = np.random.default_rng(rng)
+    objectives = cached_objectives(mat)
+    rejects = cached_rejects(mat, topology)
+    front = {(r, c) for (r, c, *_) in true_front}
+    total = len(front)
+    coverage = np.zeros(runs)
+    stagnation_steps = np.empty(runs, dtype=np.int64)
+    starts = rng.integers(rows * cols, size=runs) if starts is None else np.asarray(starts)
+    block_rng = BlockRNG(rng)
+    for i, cell in enumerate(starts.tolist()):
+        pop, stagnation_steps[i] = semo_search(mat, iterations, topology, divmod(cell, cols),
+                                               block_rng, stop_on_stagnation=stop_on_stagnation,
+                                               objectives=objectives, rejects=rejects)
+        if total > 0:
+            coverage[i] = sum(1 for p in pop if p in front) / total
+    return coverage, stagnation_steps
+
+
+def select_engine(mat, true_front, engine="auto"):
+    """
+    返回实际使用的引擎对应的函数（batch_semo_with_stagnation 或 scalar_semo_with_stagnation）
+    及其名字。engine="auto" 在双目标且真实前沿不超过 BATCH_MAX_FRONT 个点时选批量引擎，
+    否则选标量（档案很大时批量引擎不再更快；批量引擎只支持双目标）。
+    """
+    if engine == "auto":
+        engine = "batch" if mat.shape[2] == 2 and len(true_front) <= BATCH_MAX_FRONT else "scalar"
+    if engine == "batch":
+        return batch_semo_with_stagnation, engine
+    if engine == "scalar":
+        return scalar_semo_with_stagnation, engine
+    raise ValueError(f"未知的引擎: {engine!r}（可选 'auto' / 'batch' / 'scalar'）")
+
+
+def batch_semo_summary(mat, iterations, runs, true_front, topology=None, rng=None,
+                       batch_size=10000, acc=None, checkpoint=None, every=60.0, engine="auto",
+                       keep_checkpoint=False, cov_half_width=None, stag_half_width=None,
+                       z=1.96, min_runs=2000):
+    """
+    分批（每批 batch_size 次）调用 batch_semo_with_stagnation 或 scalar_semo_with_stagnation，
+    结果直接累加进 MonteCarloAccumulator 而不保留逐次数组，内存与 runs 无关。
+    返回累加器（传入 acc 时在其上继续累加）。
+    engine="batch" 用批量引擎，"scalar" 逐次运行标量 semo_search（分布相同），"auto" 见 select_engine。
+    checkpoint 为文件路径时，每隔 every 秒（在批与批之间）写入检查点
+    （矩阵、累加器、已完成次数与随机数发生器状态，见 SEMO_checkpoint.py），全部完成后删除；
+    该文件已存在时从中恢复，最终结果与不中断运行逐位相同。
+    keep_checkpoint=True 时完成后写入最终状态并保留文件（再次调用直接返回同一结果），
+    用于同一脚本中的多组实验：全部实验结束后由调用方 remove_checkpoint。
+    给出 cov_half_width / stag_half_width 时使用序贯停止规则（同 SEMO_parallel.monte_carlo_until）：
+    每批之后检查，累计至少 min_runs 次且给出的各项置信区间半宽（z * s / sqrt(n)）都不超过目标即停止，
+    此时 runs 是运行次数的上限；实际运行次数为 acc.n，停在哪一批只取决于 rng。
+    """
+    run, engine = select_engine(mat, true_front, engine)
+    rng = np.random.default_rng(rng)
+    acc = MonteCarloAccumulator() if acc is None else acc
+    done = 0
+    if checkpoint is not None:
+        params = {
+            "driver": "batch_semo_summary",
+            "iterations": iterations,
+            "runs": runs,
+            "batch_size": batch_size,
+            "topology": None if topology is None else (topology.stencil, topology.border),
+            "engine": engine,
+            "cov_half_width": cov_half_width,
+            "stag_half_width": stag_half_width,
+            "z": z,
+            "min_runs": min_runs,
+        }
+        state = resume_state(checkpoint, params, mat)
+        if state is not None:
+            acc, rng, done = state["acc"], state["rng"], state["done"]
+        timer = CheckpointTimer(every)
+
+    def met():
+        if cov_half_width is None and stag_half_width is None or acc.n < min_runs:
+            return False
+        return ((cov_half_width is None or acc.coverage.half_width(z) <= cov_half_width) and
+                (stag_half_width is None or acc.stagnation.half_width(z) <= stag_half_width))
+
+    # 从检查点恢复时先检查一次：保留下来的最终状态可能已经达到目标
+    while done < runs and not met():
+        n = min(batch_size, runs - done)
+        coverage, stagnation_steps = run(mat, iterations, n, true_front, topology, rng=rng)
+        acc.push(coverage, stagnation_steps)
+        done += n
+        last = done == runs or met()
+        if checkpoint is not None and (timer.due() or last and keep_checkpoint):
+            save_checkpoint(checkpoint, {"params": params, "mat": mat, "done": done,
+                                         "acc": acc, "rng": rng})
+    if checkpoint is not None and not keep_checkpoint:
+        remove_checkpoint(checkpoint)
+    return acc
+
+
+if __name__ == "__main__":
+    # 批量引擎与逐次运行标量版本的速度对比（分布相同，见 tests/test_batch.py）
+    import time
+    from SEMO_8dir_cvg import generate_landscape, pareto_best_points
+
+    interation_time = 100000
+    cases = (("random", 10, 10000), ("anticorrelated", 10, 2000), ("anticorrelated", 30, 2000))
+    for landscape, n, runs in cases:
+        m = generate_landscape(landscape, n, n, seed=0)
+        real_front = pareto_best_points(m)
+        for name, topology in (("4 neighbor", Topology.four(n, n)), ("8 neighbor", Topology.eight(n, n))):
+            print(f"========== {n}x{n} {landscape}（前沿 {len(real_front)} 个点），{name}，{runs} 次 ==========")
+            for engine in ("batch", "scalar"):
+                t0 = time.time()
+                s = batch_semo_summary(m, interation_time, runs, real_front, topology, rng=0,
+                                       engine=engine).summary()
+                print(f"{engine:6s}: 平均覆盖率 {s['mean_cov']:.4f}, 平均停滞步数 {s['mean_stag']:.2f}, "
+                      f"用时 {time.time() - t0:.2f}s")
@@ -0,0 +1,225 @@
+import json
+import platform
+import time
+import tracemalloc
+import numpy as np
+from SEMO_rng import BlockRNG
+from SEMO_topology import Topology, MOVES_4, MOVES_8, default_topology
+from SEMO_8dir_cvg import (LANDSCAPES, generate_landscape, generate_matrix, objective_lists,
+                           neighbor_dominance_masks, update_population, FlatArchive,
+                           pareto_best_points, all_neighbors_dominated, semo_search)
+"""
+SEMO 性能测试套件（固定随机种子，可复现）。
+
+覆盖：
+- pareto_front      ：pareto_best_points 求真实前沿
+- archive_add       ：FlatArchive.add（热循环使用的档案）
+- update_population ：原始列表版档案更新（参考实现）
+- semo_run/4、/8     ：semo_search 主循环（固定迭代次数，不提前停止）
+- stagnation/4、/8   ：all_neighbors_dominated（在已停滞的档案上做一次完整检查）
+网格 10x10 到 2000x2000；地形 random（独立均匀）、correlated（b 与 a 正相关，前沿很小）、
+anticorrelated（b 与 a 负相关，前沿很大）。
+
+每项报告 ops/sec、每次操作的延迟（µs）和峰值内存（tracemalloc，单独一遍测量，不影响计时）。
+结果可写成 JSON 基线（--save），之后的运行与基线对比（--compare）。
+
+另有拒绝记忆的开 / 关对比（--memo，见 bench_memo）。
+"""
+
+SIZES = (10, 100, 1000, 2000)
+
+
+def _measure(fn, min_time=0.2, max_repeat=20):
+    """重复调用 fn 直到累计至少 min_time 秒，返回单次调用的最短耗时（秒）"""
+    best = float("inf")
+    total = 0.0
+    for _ in range(max_repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = min(best, dt)
+        total += dt
+        if total >= min_time:
+            break
+    return best
+
+
+def _peak_mb(fn):
+    """fn 执行期间新分配内存的峰值（MiB）"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (peak - base) / 2 ** 20
+
+
+def bench_case(fn, ops, min_time=0.2):
+    """一项测试：fn 每次调用完成 ops 次操作"""
+    seconds = _measure(fn, min_time)
+    return {
+        "ops_per_sec": ops / seconds,
+        "latency_us": seconds / ops * 1e6,
+        "peak_mb": _peak_mb(fn),
+    }
+
+
+def _cases(kind, n, iterations, seed):
+    """产出 (名称, 函数, 每次调用的操作数)；准备工作（建表、取值列表）不计入测试"""
+    m = generate_landscape(kind, n, n, seed)
+    A, B = objective_lists(m)
+    rng = np.random.default_rng(seed)
+
+    yield "pareto_front", lambda: pareto_best_points(m), 1
+
+    cells = rng.integers(n * n, size=50000).tolist()
+
+    def archive_add():
+        archive = FlatArchive(A, B)
+        for cell in cells:
+            archive.add(cell)
+    yield "archive_add", archive_add, len(cells)
+
+    coords = [divmod(cell, n) for cell in cells[:2000]]
+
+    def list_update():
+        population = []
+        for cand in coords:
+            update_population(population, cand, m)
+    yield "update_population", list_update, len(coords)
+
+    start = (n // 2, n // 2)
+    for tag, moves in (("4", MOVES_4), ("8", MOVES_8)):
+        # 超过 LAZY_CELLS 的网格（2000x2000）默认使用按需计算的邻居表
+        topology = Topology(n, n, moves)
+        rejects = neighbor_dominance_masks(m, topology)
+        rejects = rejects.tolist() if rejects is not None else None
+
+        def run(topology=topology, rejects=rejects):
+            semo_search(m, iterations, topology, start, BlockRNG(seed),
+                        objectives=(A, B), rejects=rejects)
+        yield f"semo_run/{tag}", run, iterations
+
+        population, _ = semo_search(m, iterations, topology, start, BlockRNG(seed),
+                                    stop_on_stagnation=True, objectives=(A, B), rejects=rejects)
+        yield (f"stagnation/{tag}",
+               lambda topology=topology, population=population:
+               all_neighbors_dominated(population, m, n, n, topology), 1)
+
+
+def run_suite(sizes=SIZES, kinds=LANDSCAPES, iterations=20000, seed=0, min_time=0.2,
+              verbose=True):
+    """运行全部测试，返回 {"meta": ..., "results": {名称/地形/尺寸: 指标}}"""
+    results = {}
+    for n in sizes:
+        for kind in kinds:
+            for name, fn, ops in _cases(kind, n, iterations, seed):
+                key = f"{name}/{kind}/{n}x{n}"
+                results[key] = bench_case(fn, ops, min_time)
+                if verbose:
+                    r = results[key]
+                    print(f"{key:42s} {r['ops_per_sec']:14.1f} ops/s "
+                          f"{r['latency_us']:12.3f} µs/op {r['peak_mb']:9.2f} MiB")
+    meta = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "iterations": iterations,
+        "seed": seed,
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(current, baseline, threshold=0.10):
+    """与基线逐项对比 ops/sec，变慢超过 threshold 的项标记为 REGRESSION；返回回退项列表"""
+    regressions = []
+    base = baseline["results"]
+    for key, r in current["results"].items():
+        if key not in base:
+            print(f"{key:42s} （基线中没有）")
+            continue
+        ratio = r["ops_per_sec"] / base[key]["ops_per_sec"]
+        mem = r["peak_mb"] - base[key]["peak_mb"]
+        flag = ""
+        if ratio < 1 - threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        elif ratio > 1 + threshold:
+            flag = "  faster"
+        print(f"{key:42s} {ratio:7.2f}x  内存 {mem:+9.2f} MiB{flag}")
+    return regressions
+
+
+def time_search(mat, iterations, topology, seeds, repeat=3, **kwargs):
+    """对每个种子运行一次 semo_search，重复 repeat 遍取最快的一遍；返回 (每次运行秒数, 档案列表)"""
+    rows, cols, _ = mat.shape
+    objectives = objective_lists(mat)
+    rejects = neighbor_dominance_masks(mat, topology)
+    rejects = rejects.tolist() if rejects is not None else None
+    best = float("inf")
+    for _ in range(repeat):
+        pops = []
+        t0 = time.perf_counter()
+        for seed in seeds:
+            rng = BlockRNG(seed)
+            start = (rng.randrange(rows), rng.randrange(cols))
+            pop, _ = semo_search(mat, iterations, topology, start, rng,
+                                 objectives=objectives, rejects=rejects, **kwargs)
+            pops.append(pop)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(seeds), pops
+
+
+def bench_memo(sizes=(100, 1000), iterations=100000, seeds=range(5), eight=False,
+               kinds=("random", "anticorrelated")):
+    """
+    拒绝记忆（semo_search 的 memo 参数）：接近停滞时 SEMO 反复提出同几个早已被拒绝的邻居，
+    开启记忆后它们只需一次集合查找。对比开 / 关记忆的耗时（同一随机种子，两者得到的档案完全相同）。
+    档案越大，一次入档比较越贵，记忆越划算：anticorrelated（前沿大）上稳定快 1.4～1.6 倍；
+    random 的档案只有几个点，快 1.0～1.5 倍，随机器负载波动较大。开 / 关交替各测两轮取最快。
+    """
+    for kind in kinds:
+        for n in sizes:
+            m = generate_landscape(kind, n, n, seed=0)
+            topology = default_topology(n, n, eight)
+            t_off = t_on = float("inf")
+            for _ in range(2):
+                dt, pops_off = time_search(m, iterations, topology, seeds, memo=False)
+                t_off = min(t_off, dt)
+                dt, pops_on = time_search(m, iterations, topology, seeds, memo=True)
+                t_on = min(t_on, dt)
+            print(f"{n}x{n} {kind} {'8' if eight else '4'} neighbor, {iterations} 次迭代: "
+                  f"无记忆 {t_off * 1000:.1f}ms，有记忆 {t_on * 1000:.1f}ms，"
+                  f"加速 {t_off / t_on:.2f}x，结果相同: {pops_off == pops_on}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SEMO 性能测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="网格边长")
+    parser.add_argument("--kinds", nargs="+", default=list(LANDSCAPES), choices=LANDSCAPES)
+    parser.add_argument("--iterations", type=int, default=20000, help="semo_run 的迭代次数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="JSON", help="把结果写成基线文件")
+    parser.add_argument("--compare", metavar="JSON", help="与基线文件对比")
+    parser.add_argument("--threshold", type=float, default=0.10, help="判定回退的相对变慢比例")
+    parser.add_argument("--memo", action="store_true", help="只运行拒绝记忆开 / 关对比")
+    args = parser.parse_args()
+
+    if args.memo:
+        bench_memo(eight=False)
+        bench_memo(eight=True)
+    else:
+        current = run_suite(args.sizes, args.kinds, args.iterations, args.seed)
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump(current, f, indent=2)
+            print(f"已写入基线 {args.save}")
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+            print(f"\n========== 与基线 {args.compare} 对比（ops/sec 比值）==========")
+            regressions = compare(current, baseline, args.threshold)
+            print(f"回退项: {len(regressions)}")
@@ -0,0 +1,84 @@
+import os
+import pickle
+import time
+import numpy as np
+"""
+长时间 Monte Carlo 实验的检查点（断点续跑）。
+
+检查点是一个 pickle 文件，内容为字典：
+- params ：实验参数（驱动函数名、迭代次数、总运行次数、分批大小、拓扑等），续跑时逐项核对
+- mat    ：实验所用的矩阵（脚本中的矩阵未固定种子，重启时必须从检查点取回同一张矩阵）
+- done   ：已完成的运行次数（或块数）
+- acc    ：已完成部分的 MonteCarloAccumulator
+- rng    ：随机数发生器（numpy Generator 本身，pickle 会保存其完整状态；按块派生种子的驱动不需要）
+
+写入先到同目录的临时文件，fsync 后 os.replace 覆盖，进程任何时刻被杀都不会留下半个检查点。
+每批 / 每块结束时的状态完全确定，所以从检查点续跑得到的最终统计与不中断运行逐位相同。
+实验完成后删除检查点：同一命令再次运行即开始新的实验，不会重放旧结果，也不会与改过的参数冲突。
+一个脚本依次运行多组实验时用 keep_checkpoint=True 保留已完成各组的检查点，
+全部完成后再统一 remove_checkpoint：中途被杀时已完成的组直接取回结果，不会重跑。
+中途改变参数时 resume_state 报错，删除检查点文件即可按新参数重新开始。
+"""
+
+
+def save_checkpoint(path, state):
+    """原子地写入检查点"""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    """读取检查点；文件不存在时返回 None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def remove_checkpoint(path):
+    """实验完成后删除检查点（文件不存在时什么都不做）"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def checkpoint_matrix(path):
+    """检查点中保存的矩阵（没有检查点时返回 None），脚本据此决定是否重新生成矩阵"""
+    state = load_checkpoint(path)
+    return None if state is None else state["mat"]
+
+
+def resume_state(path, params, mat):
+    """
+    读取 path 处的检查点并核对参数与矩阵；没有检查点返回 None。
+    参数或矩阵不一致时抛出 ValueError（另一个实验的检查点，不能混用）。
+    """
+    state = load_checkpoint(path)
+    if state is None:
+        return None
+    if state["params"] != params:
+        raise ValueError(f"检查点 {path} 的参数与本次不同: {state['params']} != {params}"
+                         f"（删除该文件即可按新参数重新开始）")
+    if not np.array_equal(state["mat"], mat):
+        raise ValueError(f"检查点 {path} 中的矩阵与本次不同（删除该文件即可重新开始）")
+    return state
+
+
+class CheckpointTimer:
+    """距上次写入超过 every 秒时 due() 返回 True（every=0 表示每批都写）"""
+
+    def __init__(self, every=60.0):
+        self.every = every
+        self.last = time.monotonic()
+
+    def due(self):
+        now = time.monotonic()
+        if now - self.last >= self.every:
+            self.last = now
+            return True
+        return False
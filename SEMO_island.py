@@ -0,0 +1,209 @@
+import multiprocessing as mp
+import time
+import numpy as np
+from SEMO_rng import BlockRNG
+from SEMO_topology import default_topology
+from SEMO_ndtree import NDArchive
+from SEMO_8dir_cvg import FlatArchive, objectives_for, neighbor_dominance_masks, semo_search
+"""
+岛屿模型（island model）并行 SEMO。
+
+大网格上单次 SEMO 只在起点附近探索，沿前沿扩散得很慢。岛屿模式启动 W 个工作进程，
+每个进程（岛）在同一张网格上从不同起点运行 SEMO；每 epoch 次迭代为一轮：
+1. 各岛运行 epoch 次迭代，通过管道把档案成员（展平下标）发给主进程；
+2. 主进程按标准档案规则把各岛档案并入全局档案，计算全局档案的覆盖率；
+3. 主进程把全局档案的成员（或随机抽取的 migrants 个）发回各岛，各岛逐个 add 进自己的档案。
+全局档案达到目标覆盖率、总迭代次数用完，或某一轮所有岛都停滞且全局档案没有变化
+（再发回同样的成员也不会有新进展）时停止。
+
+对比基准是同样总迭代次数的单次长运行（同样按 epoch 分段记录覆盖率与耗时），
+报告两者达到目标覆盖率的墙钟时间与迭代次数。
+各岛在一轮内停滞后提前结束该轮（档案不再变化，空转没有意义），
+记录的累计迭代次数是实际运行的次数，可能少于预算。
+"""
+
+
+def _new_archive(mat, objectives, cells):
+    if mat.shape[2] == 2:
+        A, B = objectives
+        return FlatArchive(A, B, cells)
+    return NDArchive(objectives, cells)
+
+
+def _island_worker(conn, mat, eight, seed_seq):
+    """
+    一个岛：先回报起点，之后每收到一条消息 (迁入成员, 本轮迭代次数) 就把迁入成员并入档案、
+    运行一轮 SEMO，回报 (档案成员, 实际迭代次数)；收到 None 时退出。
+    """
+    rows, cols, _ = mat.shape
+    topology = default_topology(rows, cols, eight)
+    objectives = objectives_for(mat)
+    rejects = neighbor_dominance_masks(mat, topology)
+    rejects = rejects.tolist() if rejects is not None else None
+    rng = BlockRNG(seed_seq)
+    archive = _new_archive(mat, objectives, [rng.randrange(rows) * cols + rng.randrange(cols)])
+    conn.send((list(archive.cells), 0))
+
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        migrants, iterations = msg
+        for cell in migrants:
+            archive.add(cell)
+        _, steps = semo_search(mat, iterations, topology, None, rng, stop_on_stagnation=True,
+                               rejects=rejects, archive=archive)
+        conn.send((list(archive.cells), steps))
+    conn.close()
+
+
+def _coverage(archive, front):
+    return sum(1 for cell in archive.cells if cell in front) / len(front) if front else 0.0
+
+
+def _record(history, t0, iterations, cov, target, hit):
+    history.append((time.perf_counter() - t0, iterations, cov))
+    if hit is None and target is not None and cov >= target:
+        return history[-1]
+    return hit
+
+
+def island_semo(mat, iterations, true_front, workers=4, epoch=10000, eight=False, seed=0,
+                target=None, migrants=None):
+    """
+    岛屿模型：workers 个岛共享 iterations 次迭代的总预算（每岛每轮 epoch 次）。
+    migrants 为每轮发回每个岛的全局档案成员数（None 表示全部）；
+    target 为目标覆盖率，全局档案达到后停止（None 表示跑完预算）。
+    返回字典：
+    history  —— 每轮结束时的 (墙钟秒数, 累计实际迭代次数, 全局覆盖率)，第一项为各岛起点；
+    target_time / target_iterations —— 首次达到 target 时的墙钟秒数与累计迭代次数（未达到为 None）；
+    population —— 全局档案的 (r, c) 坐标列表。
+    墙钟时间从启动工作进程之前开始计（包含进程启动与建表的开销）。
+    """
+    rows, cols, _ = mat.shape
+    front = {r * cols + c for (r, c, *_) in true_front}
+    # 前 workers 个子种子给各岛，最后一个用于抽取迁移成员
+    seeds = np.random.SeedSequence(seed).spawn(workers + 1)
+    rng = np.random.default_rng(seeds[-1])
+    ctx = mp.get_context()
+
+    t0 = time.perf_counter()
+    conns, procs = [], []
+    for seed_seq in seeds[:workers]:
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(target=_island_worker, args=(child, mat, eight, seed_seq), daemon=True)
+        proc.start()
+        child.close()
+        conns.append(parent)
+        procs.append(proc)
+
+    archive = _new_archive(mat, objectives_for(mat), [])
+    history = []
+    hit = None
+    budget = iterations
+    done = 0
+    try:
+        for conn in conns:
+            for cell in conn.recv()[0]:
+                archive.add(cell)
+        hit = _record(history, t0, done, _coverage(archive, front), target, hit)
+
+        while budget > 0 and hit is None:
+            per_island = min(epoch, -(-budget // workers))
+            for conn in conns:
+                members = list(archive.cells)
+                if migrants is not None and len(members) > migrants:
+                    members = rng.choice(members, migrants, replace=False).tolist()
+                conn.send((members, per_island))
+            changed = False
+            stagnated = True
+            for conn in conns:
+                cells, steps = conn.recv()
+                done += steps
+                stagnated = stagnated and steps < per_island
+                for cell in cells:
+                    changed = archive.add(cell) or changed
+            # 预算按轮扣除：提前停滞的岛没用完的迭代不再补给其他岛
+            budget -= per_island * workers
+            hit = _record(history, t0, done, _coverage(archive, front), target, hit)
+            if stagnated and not changed:
+                break
+    finally:
+        for conn in conns:
+            conn.send(None)
+            conn.close()
+        for proc in procs:
+            proc.join()
+
+    return {
+        "history": history,
+        "target_time": hit[0] if hit else None,
+        "target_iterations": hit[1] if hit else None,
+        "population": [divmod(i, cols) for i in archive.sorted_indices()],
+    }
+
+
+def single_semo(mat, iterations, true_front, epoch=10000, eight=False, seed=0, target=None):
+    """
+    对照：单次长运行，同样每 epoch 次迭代记录一次 (墙钟秒数, 累计实际迭代次数, 覆盖率)，
+    返回格式与 island_semo 相同。停滞后档案不再变化，直接停止。
+    """
+    rows, cols, _ = mat.shape
+    front = {r * cols + c for (r, c, *_) in true_front}
+
+    t0 = time.perf_counter()
+    topology = default_topology(rows, cols, eight)
+    rejects = neighbor_dominance_masks(mat, topology)
+    rejects = rejects.tolist() if rejects is not None else None
+    rng = BlockRNG(seed)
+    archive = _new_archive(mat, objectives_for(mat), [rng.randrange(rows) * cols + rng.randrange(cols)])
+    history = []
+    hit = _record(history, t0, 0, _coverage(archive, front), target, None)
+    done = 0
+    while done < iterations and hit is None:
+        n = min(epoch, iterations - done)
+        _, steps = semo_search(mat, n, topology, None, rng, stop_on_stagnation=True,
+                               rejects=rejects, archive=archive)
+        done += steps
+        hit = _record(history, t0, done, _coverage(archive, front), target, hit)
+        if steps < n:
+            break
+
+    return {
+        "history": history,
+        "target_time": hit[0] if hit else None,
+        "target_iterations": hit[1] if hit else None,
+        "population": [divmod(i, cols) for i in archive.sorted_indices()],
+    }
+
+
+def compare_island(mat, iterations, true_front, target, workers=4, epoch=10000, eight=False,
+                   seed=0, migrants=None):
+    """同样总迭代次数下岛屿模型与单次长运行达到 target 覆盖率的对比，打印并返回两者的结果"""
+    single = single_semo(mat, iterations, true_front, epoch, eight, seed, target)
+    island = island_semo(mat, iterations, true_front, workers, epoch, eight, seed, target, migrants)
+    for name, res in (("单次长运行", single), (f"岛屿模型 ({workers} 岛)", island)):
+        t, it, cov = res["history"][-1]
+        if res["target_time"] is not None:
+            reach = f"{res['target_time']:.2f}s / {res['target_iterations']} 次迭代达到"
+        else:
+            reach = "未达到"
+        print(f"{name:12s} 目标覆盖率 {target:.2f}: {reach}；"
+              f"结束时覆盖率 {cov:.4f}（{it} 次迭代，{t:.2f}s）")
+    return single, island
+
+
+if __name__ == "__main__":
+    from SEMO_8dir_cvg import generate_landscape, pareto_best_points
+
+    rows, cols = 40, 40
+    interation_time = 400000
+
+    m = generate_landscape("anticorrelated", rows, cols, seed=0)
+    real_front = pareto_best_points(m)
+    print(f"{rows}x{cols} anticorrelated，真实前沿 {len(real_front)} 个点，总迭代预算 {interation_time}，"
+          f"本机 {mp.cpu_count()} 核")
+    for eight in (False, True):
+        print(f"========== {'8' if eight else '4'} neighbor ==========")
+        compare_island(m, interation_time, real_front, target=0.3, workers=4, epoch=2000,
+                       eight=eight)
@@ -0,0 +1,115 @@
+import numpy as np
+from SEMO_8dir_cvg import fixed_point_dtype, pareto_best_points
+"""
+超大网格（如 20000x20000 以上）的内存映射支持：
+
+1. generate_matrix_memmap：由随机种子按行块（tile）逐块生成矩阵，直接写入 np.memmap 形式的 .npy 文件，
+   峰值内存只与块大小有关；生成结果与块大小无关（同一个 Generator 顺序取数）。
+2. pareto_best_points_streaming：逐块读取矩阵，求块内前沿后与全局前沿合并，
+   峰值内存 = 一个块 + 前沿大小；结果与 pareto_best_points 完全相同（包括等值点保留行优先第一个）。
+3. open_matrix：以只读内存映射方式打开 .npy；run_semo* 可直接接收它，
+   只按需读取实际访问到的格点（见 objective_lists 与 Topology 的 lazy 模式）。
+"""
+
+# 默认每块约 4M 个格点
+_TILE_CELLS = 1 << 22
+
+
+def _tile_rows(cols, tile_rows):
+    return tile_rows if tile_rows else max(1, _TILE_CELLS // max(cols, 1))
+
+
+def generate_matrix_memmap(path, rows, cols, value_range=(0, 100), decimals=2,
+                           integer=False, seed=0, tile_rows=None):
+    """
+    按块生成 (rows x cols x 2) 矩阵并写入 path（.npy 格式），返回只读内存映射。
+    取值范围与舍入规则与 generate_matrix 相同（随机数来自 np.random.default_rng(seed)）；
+    integer=True 时同样以定点整数存储。
+    """
+    rng = np.random.default_rng(seed)
+    lo, hi = value_range
+    scale = 10 ** decimals
+    dtype = fixed_point_dtype(lo * scale, hi * scale) if integer else np.float64
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(rows, cols, 2))
+
+    step = _tile_rows(cols, tile_rows)
+    for r0 in range(0, rows, step):
+        r1 = min(rows, r0 + step)
+        tile = rng.random((r1 - r0, cols, 2)) * (hi - lo) + lo
+        out[r0:r1] = np.rint(tile * scale) if integer else np.round(tile, decimals)
+    out.flush()
+    del out
+    return open_matrix(path)
+
+
+def open_matrix(path):
+    """以只读内存映射方式打开 generate_matrix_memmap 写出的矩阵"""
+    return np.load(path, mmap_mode="r")
+
+
+def pareto_best_points_streaming(mat, tile_rows=None):
+    """
+    逐块计算真实 Pareto 前沿（双目标最大化），适用于内存映射的超大矩阵。
+    返回 [(r, c, a, b)]，按 a 降序、b 降序排序，与 pareto_best_points 相同。
+    """
+    rows, cols, n_obj = mat.shape
+    if n_obj != 2:
+        raise ValueError(f"逐块求前沿只支持双目标矩阵，当前为 {n_obj} 个目标")
+    front_idx = np.empty(0, dtype=np.int64)
+    front_a = np.empty(0, dtype=mat.dtype)
+    front_b = np.empty(0, dtype=mat.dtype)
+
+    step = _tile_rows(cols, tile_rows)
+    for r0 in range(0, rows, step):
+        tile = np.asarray(mat[r0:r0 + step])
+        tile_front = pareto_best_points(tile)
+        if not tile_front:
+            continue
+        idx = np.array([(r0 + r) * cols + c for (r, c, a, b) in tile_front], dtype=np.int64)
+        a = np.array([a for (r, c, a, b) in tile_front], dtype=mat.dtype)
+        b = np.array([b for (r, c, a, b) in tile_front], dtype=mat.dtype)
+
+        # 合并：前沿(X ∪ Y) = 前沿(前沿(X) ∪ 前沿(Y))。
+        # 按 a 降序、b 降序、行优先下标升序排序后做同样的前缀最大值筛选
+        idx = np.concatenate([front_idx, idx])
+        a = np.concatenate([front_a, a])
+        b = np.concatenate([front_b, b])
+        order = np.lexsort((idx, -b, -a))
+        sb = b[order]
+        keep = np.empty(sb.size, dtype=bool)
+        keep[0] = True
+        keep[1:] = sb[1:] > np.maximum.accumulate(sb[:-1])
+        order = order[keep]
+        front_idx, front_a, front_b = idx[order], a[order], b[order]
+
+    return [(int(i // cols), int(i % cols), front_a[n], front_b[n])
+            for n, i in enumerate(front_idx.tolist())]
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+    import time
+    from SEMO_8dir_cvg import run_semo_with_stagnation, semo_coverage_rate
+
+    rows, cols = 4000, 4000
+    interation_time = 100000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "grid.npy")
+        t0 = time.time()
+        m = generate_matrix_memmap(path, rows, cols, (0, 100), 2, integer=True, seed=0)
+        t1 = time.time()
+        real_front = pareto_best_points_streaming(m)
+        t2 = time.time()
+        print(f"生成 {rows}x{cols} 内存映射矩阵: {t1 - t0:.2f}s，文件 {os.path.getsize(path) / 2**20:.1f} MiB")
+        print(f"分块计算真实 Pareto 前沿: {len(real_front)} 个点，{t2 - t1:.2f}s")
+        print("与整体读入内存的结果一致:", real_front == pareto_best_points(np.asarray(m)))
+
+        t2 = time.time()
+        semo_pop, stagnation_steps = run_semo_with_stagnation(m, interation_time, rng=random.Random(0))
+        hit, total, rate = semo_coverage_rate(semo_pop, real_front)
+        print(f"在内存映射矩阵上运行 SEMO: 档案 {len(semo_pop)} 个点，停滞步数 {stagnation_steps}，"
+              f"覆盖率 {rate:.4f}，用时 {time.time() - t2:.2f}s")
+        del m
@@ -0,0 +1,295 @@
+import numpy as np
+from operator import ge
+"""
+k 目标（k >= 3）最大化的非支配档案与真实前沿。
+
+双目标档案 FlatArchive 依赖“按 a 升序则 b 必降序”的阶梯结构；k >= 3 时前沿没有这样的全序，
+前沿规模随 k 组合式增长，逐点线性扫描档案成为瓶颈。这里用 ND-tree
+（Jaszkiewicz & Lust, 2018）索引档案：每个节点记录其子树内各目标的最大值 ideal 与最小值 nadir，
+- nadir 弱支配候选点 → 子树内每个点都弱支配候选点，直接拒绝；
+- 候选点弱支配 ideal 且不等值 → 整棵子树都被严格支配，整体淘汰；
+- ideal 不弱支配候选点、候选点也不弱支配 nadir → 子树与候选点互不支配，整体跳过。
+只有剩下的节点需要向下检查，叶子内才逐点比较。
+
+档案规则与 update_population 相同：等值点去重、被支配则丢弃、移除被候选点严格支配的点。
+目标值从 V 按展平下标读取，V[i] 为目标值元组（见 SEMO_8dir_cvg.objective_vectors）。
+"""
+
+# 叶子最多容纳的点数；超过即分裂为 k + 1 个子节点
+LEAF_SIZE = 20
+
+
+def dominates(u, v):
+    """u 是否严格支配 v（任意维目标值元组，最大化）"""
+    return all(map(ge, u, v)) and u != v
+
+
+class _Node:
+    __slots__ = ("ideal", "nadir", "cells", "children")
+
+    def __init__(self, ideal, nadir, cells=None, children=None):
+        self.ideal = ideal
+        self.nadir = nadir
+        self.cells = cells          # 叶子：成员下标列表
+        self.children = children    # 内部节点：子节点列表
+
+
+def _midpoint_dist(node, v):
+    """v 到节点 ideal / nadir 中点的距离平方（插入时选子节点用）"""
+    return sum((x - (i + n) / 2) ** 2 for x, i, n in zip(v, node.ideal, node.nadir))
+
+
+def _dist(u, v):
+    return sum((x - y) ** 2 for x, y in zip(u, v))
+
+
+class NDArchive:
+    """
+    k 目标最大化的非支配档案，成员为展平下标，内部以 ND-tree 索引。
+    接口与 FlatArchive 相同（add / cells / last_evicted / covers / sorted_indices），
+    可直接用于 semo_search；cells 的顺序不是按目标排序的，但同样支持按下标随机选父节点。
+    """
+
+    def __init__(self, V, cells=(), leaf_size=LEAF_SIZE):
+        self.V = V
+        self.leaf_size = leaf_size
+        self.root = None
+        self.cells = []         # 成员下标（原地修改，删除时与末尾交换）
+        self._pos = {}          # 下标 → 在 cells 中的位置
+        self.last_evicted = []  # 最近一次成功 add 时被淘汰的下标
+        for cell in cells:
+            self.add(cell)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __getitem__(self, i):
+        return self.cells[i]
+
+    def add(self, cand):
+        """尝试把下标 cand 加入档案，返回是否被接收（同 update_population）"""
+        v = self.V[cand]
+        evicted = []
+        if self.root is not None:
+            if self._update(self.root, v, evicted):
+                return False
+            if not (self.root.cells or self.root.children):
+                self.root = None
+        for e in evicted:
+            self._remove_member(e)
+        self.last_evicted = evicted
+
+        self._pos[cand] = len(self.cells)
+        self.cells.append(cand)
+        if self.root is None:
+            self.root = _Node(v, v, cells=[cand])
+        else:
+            self._insert(self.root, cand, v)
+        return True
+
+    def _remove_member(self, cell):
+        pos = self._pos.pop(cell)
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[pos] = last
+            self._pos[last] = pos
+
+    def _update(self, node, v, evicted):
+        """
+        在子树 node 中处理候选点 v：v 被弱支配时返回 True（什么都不改）；
+        否则淘汰子树内被 v 严格支配的点（记入 evicted）并收紧各节点的 ideal / nadir，返回 False。
+        档案内两两互不支配，所以 v 一旦被某点弱支配，就不可能支配任何档案点：提前返回是安全的。
+        """
+        if all(map(ge, node.nadir, v)):
+            return True
+        v_ge_nadir = all(map(ge, v, node.nadir))
+        if not v_ge_nadir and not all(map(ge, node.ideal, v)):
+            return False
+        if v_ge_nadir and all(map(ge, v, node.ideal)) and v != node.ideal:
+            self._collect(node, evicted)
+            node.cells, node.children = [], None
+            return False
+
+        V = self.V
+        if node.children is None:
+            keep = []
+            for c in node.cells:
+                p = V[c]
+                if all(map(ge, p, v)):
+                    return True
+                if all(map(ge, v, p)):
+                    evicted.append(c)
+                else:
+                    keep.append(c)
+            if len(keep) != len(node.cells):
+                node.cells = keep
+                if keep:
+                    self._refit(node)
+            return False
+
+        before = len(evicted)
+        for child in node.children:
+            if self._update(child, v, evicted):
+                return True
+        if len(evicted) != before:
+            node.children = [ch for ch in node.children if ch.cells or ch.children]
+            if node.children:
+                self._refit(node)
+            else:
+                node.cells, node.children = [], None
+        return False
+
+    def _collect(self, node, out):
+        if node.children is None:
+            out.extend(node.cells)
+        else:
+            for child in node.children:
+                self._collect(child, out)
+
+    def _refit(self, node):
+        """由叶子内的点或子节点的边界重新计算 ideal / nadir"""
+        if node.children is None:
+            pts = [self.V[c] for c in node.cells]
+            node.ideal = tuple(map(max, zip(*pts)))
+            node.nadir = tuple(map(min, zip(*pts)))
+        else:
+            node.ideal = tuple(map(max, zip(*(ch.ideal for ch in node.children))))
+            node.nadir = tuple(map(min, zip(*(ch.nadir for ch in node.children))))
+
+    def _insert(self, node, cand, v):
+        while True:
+            node.ideal = tuple(map(max, node.ideal, v))
+            node.nadir = tuple(map(min, node.nadir, v))
+            if node.children is None:
+                break
+            node = min(node.children, key=lambda ch: _midpoint_dist(ch, v))
+        node.cells.append(cand)
+        if len(node.cells) > self.leaf_size:
+            self._split(node)
+
+    def _split(self, node):
+        """
+        叶子溢出：以与其余点平均距离最大的点为第一个种子，依次选与已有种子平均距离最大的点，
+        共 k + 1 个种子各成一个子叶子，其余点放进中点最近的子叶子。
+        """
+        V = self.V
+        cells = node.cells
+        pts = [V[c] for c in cells]
+        n = len(cells)
+        dist = [[_dist(pts[i], pts[j]) for j in range(n)] for i in range(n)]
+        seeds = [max(range(n), key=lambda i: sum(dist[i]))]
+        rest = set(range(n)) - set(seeds)
+        while len(seeds) < len(pts[0]) + 1 and rest:
+            s = max(sorted(rest), key=lambda i: sum(dist[i][j] for j in seeds))
+            seeds.append(s)
+            rest.discard(s)
+        children = [_Node(pts[s], pts[s], cells=[cells[s]]) for s in seeds]
+        for i in sorted(rest):
+            child = min(children, key=lambda ch: _midpoint_dist(ch, pts[i]))
+            child.cells.append(cells[i])
+            child.ideal = tuple(map(max, child.ideal, pts[i]))
+            child.nadir = tuple(map(min, child.nadir, pts[i]))
+        node.cells, node.children = None, children
+
+    def dominated(self, v):
+        """目标值元组 v 是否被档案中某点严格支配（与某点等值不算）"""
+        if self.root is None:
+            return False
+        V = self.V
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if not all(map(ge, node.ideal, v)):
+                continue
+            if node.children is None:
+                for c in node.cells:
+                    p = V[c]
+                    if all(map(ge, p, v)) and p != v:
+                        return True
+            else:
+                stack.extend(node.children)
+        return False
+
+    def covers(self, cell):
+        """下标 cell 是否被档案中某点严格支配"""
+        return self.dominated(self.V[cell])
+
+    def undominated_by(self, cand, cells):
+        """cells 中不被成员 cand 严格支配的下标集合"""
+        V = self.V
+        v = V[cand]
+        return {n for n in cells if not dominates(v, V[n])}
+
+    def sorted_indices(self):
+        """按目标值字典序降序返回成员下标（双目标时即 a 降序、b 降序）"""
+        return sorted(self.cells, key=self.V.__getitem__, reverse=True)
+
+
+def pareto_front_nd(mat, block=256, chunk=4096):
+    """
+    k 目标矩阵 (rows, cols, k) 的真实非支配解集合（最大化），向量化的排序-过滤算法：
+    按目标值字典序降序稳定排序后，一个点只可能被排在它前面的点弱支配。
+    每次取剩余候选的前 block 个点，块内两两比较，不被块内更早的点弱支配的点即为前沿点；
+    再用这些前沿点一次性淘汰剩余候选（分段比较，限制临时数组大小）。
+    与档案规则一致：严格支配才淘汰，等值重复点只保留行优先顺序中的第一个。
+    返回 [(r, c, v0, ..., v{k-1})]，按目标值字典序降序排序。
+    """
+    rows, cols, k = mat.shape
+    V = np.asarray(mat).reshape(-1, k)
+    alive = np.lexsort(tuple(-V[:, j] for j in reversed(range(k))))
+
+    front = []
+    while alive.size:
+        blk, alive = alive[:block], alive[block:]
+        P = V[blk]
+        weak = (P[None, :, :] >= P[:, None, :]).all(-1)     # weak[i, j]: 块内 j 弱支配 i
+        new = blk[~np.tril(weak, -1).any(1)]
+        front.append(new)
+
+        F = V[new][None, :, :]
+        keep = np.empty(alive.size, dtype=bool)
+        for s in range(0, alive.size, chunk):
+            R = V[alive[s:s + chunk]][:, None, :]
+            keep[s:s + chunk] = ~(F >= R).all(-1).any(1)
+        alive = alive[keep]
+
+    idx = np.concatenate(front) if front else np.empty(0, dtype=np.int64)
+    return [(r, c, *mat[r, c].tolist())
+            for r, c in zip(*(x.tolist() for x in np.divmod(idx, cols)))]
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from SEMO_8dir_cvg import (generate_matrix, objective_vectors, pareto_best_points,
+                               run_semo_with_stagnation, semo_coverage_rate)
+
+    rows, cols = 100, 100
+    interation_time = 200000
+
+    for n_obj in (3, 4, 5):
+        np.random.seed(0)
+        m = generate_matrix(rows, cols, (0, 100), 2, n_obj=n_obj)
+
+        t0 = time.time()
+        real_front = pareto_best_points(m)
+        t_front = time.time() - t0
+
+        V = objective_vectors(m)
+        t0 = time.time()
+        archive = NDArchive(V, range(rows * cols))
+        t_scan = time.time() - t0
+        same = set(archive.cells) == {r * cols + c for (r, c, *_) in real_front}
+
+        random.seed(0)
+        t0 = time.time()
+        pop, steps = run_semo_with_stagnation(m, interation_time, objectives=V)
+        t_semo = time.time() - t0
+        hit, total, rate = semo_coverage_rate(pop, real_front)
+        print(f"{n_obj} 目标 {rows}x{cols}: 真实前沿 {len(real_front)} 个点（非支配排序 {t_front:.3f}s，"
+              f"ND-tree 逐点入档 {t_scan:.3f}s，结果一致: {same}）")
+        print(f"    SEMO 4 neighbor: 档案 {len(pop)} 个点，命中 {hit}/{total}（{rate:.4f}），"
+              f"{steps} 次迭代，用时 {t_semo:.2f}s")
@@ -0,0 +1,258 @@
+import os
+import numpy as np
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from SEMO_stats import MonteCarloAccumulator
+from SEMO_rng import BlockRNG
+from SEMO_trace import RunTrace
+from SEMO_checkpoint import save_checkpoint, remove_checkpoint, resume_state, CheckpointTimer
+from SEMO_8dir_cvg import (objectives_for, neighbor_dominance_masks, semo_coverage_rate,
+                           run_semo_with_stagnation, run_semo_with_stagnation_eight)
+from SEMO_topology import default_topology
+"""
+多进程 Monte Carlo 驱动：把 runs 次 run_semo_with_stagnation / _eight 分散到 ProcessPoolExecutor。
+
+可复现性：runs 被切成固定大小（chunk_size）的块，每块从同一个主种子
+np.random.SeedSequence(seed).spawn(n_chunks) 得到独立的随机数流，
+结果按块编号顺序拼接。块的划分与进程数无关，
+因此同一个 seed 无论用多少个进程，得到的覆盖率 / 停滞步数数组逐位相同。
+"""
+
+# 工作进程内共享的只读数据（由 _init_worker 在每个进程启动时设置一次）
+_worker_mat = None
+_worker_front = None
+_worker_objectives = None
+_worker_rejects = {}
+
+
+def _init_worker(mat, true_front):
+    global _worker_mat, _worker_front, _worker_objectives
+    _worker_mat = mat
+    _worker_front = true_front
+    _worker_objectives = objectives_for(mat)
+    _worker_rejects.clear()
+
+
+def _rejects(eight):
+    """本进程内按邻域类型缓存的邻居支配位掩码（列表形式）"""
+    if eight not in _worker_rejects:
+        rows, cols, _ = _worker_mat.shape
+        masks = neighbor_dominance_masks(_worker_mat, default_topology(rows, cols, eight))
+        _worker_rejects[eight] = masks.tolist() if masks is not None else None
+    return _worker_rejects[eight]
+
+
+def _chunk_rng(seed_seq):
+    """由 SeedSequence 生成一个独立的块式随机数流"""
+    return BlockRNG(seed_seq)
+
+
+def _run_chunk(task):
+    """运行一个块：返回 (coverage, stagnation_steps, trace)，trace 为本块的插桩记录（未开启时为 None）"""
+    n_runs, iterations, eight, seed_seq, traced = task
+    run = run_semo_with_stagnation_eight if eight else run_semo_with_stagnation
+    rng = _chunk_rng(seed_seq)
+    rejects = _rejects(eight)
+    trace = RunTrace() if traced else None
+
+    coverage = np.empty(n_runs)
+    stagnation = np.empty(n_runs, dtype=np.int64)
+    for i in range(n_runs):
+        semo_pop, stagnation_steps = run(_worker_mat, iterations, rng=rng,
+                                         objectives=_worker_objectives, rejects=rejects,
+                                         trace=trace)
+        _, _, coverage[i] = semo_coverage_rate(semo_pop, _worker_front)
+        stagnation[i] = stagnation_steps
+    return coverage, stagnation, trace
+
+
+def _run_chunk_summary(task):
+    """运行一个块，只返回该块的流式统计累加器（不回传逐次结果）"""
+    acc = MonteCarloAccumulator()
+    coverage, stagnation, acc.trace = _run_chunk(task)
+    acc.push(coverage, stagnation)
+    return acc
+
+
+def _chunk_tasks(iterations, runs, eight, seed, chunk_size, trace=False):
+    n_chunks = -(-runs // chunk_size)
+    seqs = np.random.SeedSequence(seed).spawn(n_chunks)
+    return [(min(chunk_size, runs - i * chunk_size), iterations, eight, seqs[i], trace)
+            for i in range(n_chunks)]
+
+
+@contextmanager
+def _chunk_pool(mat, true_front, workers):
+    """产出一个 map(fn, tasks)，按块编号顺序返回结果（workers=1 时在当前进程内执行）"""
+    if workers == 1:
+        _init_worker(mat, true_front)
+        yield map
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(mat, true_front)) as ex:
+        # map 按提交顺序返回结果，合并顺序与调度无关
+        yield ex.map
+
+
+@contextmanager
+def _chunk_executor(mat, true_front, workers):
+    """
+    产出 submit(fn, task) -> Future（workers=1 时在当前进程内立即执行）。
+    退出时取消尚未开始的块并立即返回，不等待已提交但不再需要的块。
+    """
+    if workers == 1:
+        _init_worker(mat, true_front)
+
+        def submit(fn, task):
+            fut = Future()
+            fut.set_result(fn(task))
+            return fut
+        yield submit
+        return
+    ex = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(mat, true_front))
+    try:
+        yield ex.submit
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
+def _map_chunks(fn, tasks, mat, true_front, workers):
+    """按块编号顺序逐个产出各块结果"""
+    with _chunk_pool(mat, true_front, workers) as pmap:
+        yield from pmap(fn, tasks)
+
+
+def monte_carlo_stagnation(mat, iterations, runs, true_front, eight=False,
+                           seed=0, workers=None, chunk_size=1000):
+    """
+    并行运行 runs 次带停滞判断的 SEMO（eight=True 为 8 邻居）。
+    workers 为进程数（None 表示 CPU 核数，1 表示在当前进程内顺序执行）。
+    返回 (coverage, stagnation_steps)：按块顺序合并的两个长度为 runs 的数组。
+    """
+    tasks = _chunk_tasks(iterations, runs, eight, seed, chunk_size)
+    results = list(_map_chunks(_run_chunk, tasks, mat, true_front, workers))
+    if not results:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    coverage = np.concatenate([c for c, _, _ in results])
+    stagnation = np.concatenate([s for _, s, _ in results])
+    return coverage, stagnation
+
+
+def monte_carlo_summary(mat, iterations, runs, true_front, eight=False,
+                        seed=0, workers=None, chunk_size=1000, trace=False,
+                        checkpoint=None, every=60.0, keep_checkpoint=False):
+    """
+    与 monte_carlo_stagnation 相同的并行运行，但每个块只回传 MonteCarloAccumulator，
+    主进程按块顺序合并，内存与 runs 无关；同一 seed 下结果与进程数无关。
+    trace=True 时每次运行都插桩（见 SEMO_trace.py），合并后的记录在 acc.trace。
+    checkpoint 为文件路径时，每隔 every 秒写入检查点（矩阵、已合并的累加器、已完成块数），全部完成后删除；
+    该文件已存在时跳过已完成的块继续运行。各块的种子只由 seed 与块编号决定，
+    所以续跑的结果与不中断运行逐位相同（进程数可以不同）。
+    keep_checkpoint=True 时完成后保留检查点（同 SEMO_batch.batch_semo_summary）。
+    """
+    acc = MonteCarloAccumulator()
+    tasks = _chunk_tasks(iterations, runs, eight, seed, chunk_size, trace)
+    done = 0
+    if checkpoint is not None:
+        params = {
+            "driver": "monte_carlo_summary",
+            "iterations": iterations,
+            "runs": runs,
+            "eight": eight,
+            "seed": seed,
+            "chunk_size": chunk_size,
+            "trace": trace,
+        }
+        state = resume_state(checkpoint, params, mat)
+        if state is not None:
+            acc, done = state["acc"], state["done"]
+        timer = CheckpointTimer(every)
+
+    for i, chunk_acc in enumerate(_map_chunks(_run_chunk_summary, tasks[done:], mat, true_front,
+                                              workers), done + 1):
+        acc.merge(chunk_acc)
+        last = i == len(tasks)
+        if checkpoint is not None and (timer.due() or last and keep_checkpoint):
+            save_checkpoint(checkpoint, {"params": params, "mat": mat, "done": i, "acc": acc})
+    if checkpoint is not None and not keep_checkpoint:
+        remove_checkpoint(checkpoint)
+    return acc
+
+
+def monte_carlo_until(mat, iterations, true_front, cov_half_width=None, stag_half_width=None,
+                      max_runs=100000, eight=False, seed=0, workers=None, chunk_size=1000,
+                      z=1.96, min_runs=2000, trace=False):
+    """
+    序贯停止规则：按块运行，直到平均覆盖率和平均停滞步数的置信区间半宽
+    （z * s / sqrt(n)，默认 95%）都不超过目标，或总运行次数达到 max_runs。
+    目标为 None 表示不约束该项；至少运行 min_runs 次，避免样本太少时方差估计偏小。
+    同时在跑的块不超过 workers 个，每块按提交顺序合并后立即检查；达到目标时取消其余的块并立即返回，
+    所以停在哪一块只取决于 seed，与进程数无关；
+    前 n 次运行与 monte_carlo_summary 相同 seed 下的前 n 次完全相同。
+    返回 (MonteCarloAccumulator, converged)：acc.n 即所需运行次数，converged 表示是否达到目标；
+    trace=True 时插桩记录同样合并在 acc.trace。
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    root = np.random.SeedSequence(seed)
+    acc = MonteCarloAccumulator()
+
+    def met():
+        return ((cov_half_width is None or acc.coverage.half_width(z) <= cov_half_width) and
+                (stag_half_width is None or acc.stagnation.half_width(z) <= stag_half_width))
+
+    with _chunk_executor(mat, true_front, workers) as submit:
+        pending = deque()
+        submitted = 0
+        while True:
+            # 保持 workers 个块在跑（不超过剩余预算）；块的种子按提交顺序依次派生
+            while len(pending) < workers and submitted < max_runs:
+                n = min(chunk_size, max_runs - submitted)
+                task = (n, iterations, eight, root.spawn(1)[0], trace)
+                pending.append(submit(_run_chunk_summary, task))
+                submitted += n
+            if not pending:
+                break
+            acc.merge(pending.popleft().result())
+            if acc.n >= min_runs and met():
+                for fut in pending:
+                    fut.cancel()
+                return acc, True
+    return acc, met()
+
+
+if __name__ == "__main__":
+    import time
+    from SEMO_8dir_cvg import generate_matrix, pareto_best_points
+
+    interation_time = 10000
+    rows, cols = 10, 10
+    runs = 20000
+    seed = 2024
+
+    np.random.seed(seed)
+    m = generate_matrix(rows, cols, (0, 100), 2)
+    real_front = pareto_best_points(m)
+
+    for eight in (False, True):
+        name = "8 neighbor" if eight else "4 neighbor"
+        summaries = []
+        for workers in (1, 4):
+            t0 = time.time()
+            acc = monte_carlo_summary(m, interation_time, runs, real_front,
+                                      eight=eight, seed=seed, workers=workers)
+            summaries.append(acc.summary())
+            print(f"{name} workers={workers}: 平均覆盖率 {acc.coverage.mean:.4f}, "
+                  f"平均停滞步数 {acc.stagnation.mean:.2f}, 用时 {time.time() - t0:.2f}s")
+        print(f"{name} 不同进程数结果逐位相同: {summaries[0] == summaries[1]}")
+
+        # 序贯停止：覆盖率 CI 半宽 <= 0.005 且停滞步数 CI 半宽 <= 0.5 时停止
+        t0 = time.time()
+        acc, converged = monte_carlo_until(m, interation_time, real_front, cov_half_width=0.005,
+                                           stag_half_width=0.5, max_runs=100000,
+                                           eight=eight, seed=seed, workers=1)
+        print(f"{name} 序贯停止: {'达到目标' if converged else '达到预算上限'}，需要 {acc.n} 次运行，"
+              f"覆盖率 {acc.coverage.mean:.4f} ± {acc.coverage.half_width():.4f}，"
+              f"停滞步数 {acc.stagnation.mean:.2f} ± {acc.stagnation.half_width():.2f}，"
+              f"用时 {time.time() - t0:.2f}s")
@@ -0,0 +1,147 @@
+import numpy as np
+from SEMO_topology import Topology
+"""
+可达性分析：不做模拟，直接由网格图与支配关系给出每个起点“最多能覆盖多少真实前沿点”的上界。
+
+SEMO 的档案只会变好，一个格点 q 要进入档案，必须由档案中的某个父节点 p 沿一个方向变异得到，
+且 q 不能被 p 严格支配或与 p 等值（否则必被拒绝）。于是所有曾进入档案的格点，
+都在有向图 G（边 p → q：q 是 p 的邻居且不被 p 弱支配）中从起点可达。
+另外，被起点 x 弱支配的格点（x 本身除外）永远进不了档案：x 被淘汰时淘汰者严格支配 x，
+也就支配这些格点。这类格点也不能作为中转，所以起点 x 的上界要在 G 去掉这些格点后的子图 G_x 里求。
+
+G_x 因起点而异，不能像普通可达性那样对所有起点共用一次传播。这里把起点按块处理：
+块内第 i 个起点占位集的第 i 位，allowed[q] 记录 q 在哪些起点的 G_x 中，
+reach[q] |= OR(reach[p], p → q) & allowed[q]，只沿上一遍有变化的格点逐遍传播到不动点。
+工作量约为 O(起点数 * 边数)，小网格可以算全部起点，大网格宜用 starts 抽样。
+上界为 0 的起点不可能覆盖任何前沿点，可以直接跳过；上界也可用来估计还值得投入多少次运行。
+"""
+
+_BIT = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+# 每块起点的位集占用上限（字节），决定一块里放多少个起点
+_BLOCK_BYTES = 1 << 26
+
+
+def _predecessors(A, B, table):
+    """G 的反向邻接表：preds[q] 为所有 p → q 的 p，不足处用 n_cells 补齐（对应恒为 0 的哨兵行）"""
+    n_cells = table.shape[0]
+    edges = ~((A[table] <= A[:, None]) & (B[table] <= B[:, None]))
+    src, j = np.nonzero(edges)
+    tgt = table[src, j].astype(np.int64)
+    order = np.argsort(tgt, kind="stable")
+    src, tgt = src[order], tgt[order]
+    offsets = np.searchsorted(tgt, np.arange(n_cells + 1))
+    k_in = max(1, int(np.diff(offsets).max(initial=0)))
+    preds = np.full((n_cells, k_in), n_cells, dtype=np.int64)
+    preds[tgt, np.arange(tgt.size) - offsets[tgt]] = src
+    return preds
+
+
+def reachable_front_mask(mat, true_front, topology=None, starts=None, block=None):
+    """
+    返回布尔数组 (len(starts), len(true_front))：第 s 行第 f 列表示真实前沿第 f 个点
+    （true_front 中的顺序）是否可能从起点 starts[s] 进入档案。
+    starts 为起点的扁平下标 r * cols + c（默认全部格点）；block 为每块的起点数（默认按内存上限选取）。
+    topology 默认四邻域 + 环绕边界（需预计算邻居表）。
+    """
+    rows, cols, n_obj = mat.shape
+    if n_obj != 2:
+        raise ValueError(f"可达性分析只支持双目标矩阵，当前为 {n_obj} 个目标")
+    if topology is None:
+        topology = Topology.four(rows, cols)
+    table = topology.table
+    if table is None:
+        raise ValueError("可达性分析需要预计算的邻居表（请使用 lazy=False 的 Topology）")
+    n_cells = rows * cols
+    starts = np.arange(n_cells) if starts is None else np.asarray(starts, dtype=np.int64).ravel()
+    A = np.ascontiguousarray(mat[:, :, 0]).ravel()
+    B = np.ascontiguousarray(mat[:, :, 1]).ravel()
+    front_idx = np.array([r * cols + c for (r, c, a, b) in true_front], dtype=np.int64)
+    out = np.zeros((starts.size, front_idx.size), dtype=bool)
+    if not starts.size or not front_idx.size:
+        return out
+
+    preds = _predecessors(A, B, table)
+    if block is None:
+        block = 64 * max(1, _BLOCK_BYTES // (16 * (n_cells + 1)))
+    W = -(-min(block, starts.size) // 64)
+    for b0 in range(0, starts.size, 64 * W):
+        blk = starts[b0:b0 + 64 * W]
+        word, bit = np.arange(blk.size) // 64, _BIT[np.arange(blk.size) % 64]
+        # 最后一行是哨兵：preds 的补齐位置指向它，恒为 0
+        reach = np.zeros((n_cells + 1, W), dtype=np.uint64)
+        allowed = np.zeros((n_cells, W), dtype=np.uint64)
+        for i, x in enumerate(blk):
+            ok = ~((A <= A[x]) & (B <= B[x]))
+            ok[x] = True
+            allowed[ok, word[i]] |= bit[i]
+        np.bitwise_or.at(reach, (blk, word), bit)
+
+        changed = np.unique(blk)
+        while changed.size:
+            touched = np.unique(table[changed])
+            new = np.bitwise_or.reduce(reach[preds[touched]], axis=1)
+            new &= allowed[touched] & ~reach[touched]
+            grow = new.any(axis=1)
+            changed = touched[grow]
+            reach[changed] |= new[grow]
+
+        hit = (reach[front_idx][:, :, None] & _BIT) != 0
+        out[b0:b0 + blk.size] = hit.reshape(front_idx.size, -1)[:, :blk.size].T
+    return out
+
+
+def max_coverage_bound(mat, true_front, topology=None, starts=None):
+    """
+    每个起点可达覆盖率的上界（与 semo_coverage_rate 的比率同口径）：
+    starts 为 None 时返回 (rows, cols) 的浮点数组，否则返回与 starts 对应的一维数组。
+    """
+    rows, cols, _ = mat.shape
+    n = rows * cols if starts is None else np.asarray(starts).size
+    if not true_front:
+        bound = np.zeros(n)
+    else:
+        bound = reachable_front_mask(mat, true_front, topology, starts).mean(axis=1)
+    return bound.reshape(rows, cols) if starts is None else bound
+
+
+if __name__ == "__main__":
+    import time
+    from SEMO_rng import BlockRNG
+    from SEMO_8dir_cvg import (generate_matrix, pareto_best_points, semo_coverage_rate,
+                               run_semo_with_start, run_semo_eight_with_start)
+
+    interation_time = 10000
+    rows, cols = 10, 10
+    runs_per_start = 20
+
+    np.random.seed(0)
+    m = generate_matrix(rows, cols, (0, 100), 2)
+    real_front = pareto_best_points(m)
+
+    cases = (("4 neighbor", Topology.four(rows, cols), run_semo_with_start),
+             ("8 neighbor", Topology.eight(rows, cols), run_semo_eight_with_start))
+    for name, topology, run in cases:
+        t0 = time.time()
+        bound = max_coverage_bound(m, real_front, topology)
+        t1 = time.time()
+        print(f"========== {name} ==========")
+        print(f"可达性上界: 用时 {t1 - t0:.3f}s，平均 {bound.mean():.4f}，"
+              f"上界为 0 的起点 {int((bound == 0).sum())} / {rows * cols}")
+
+        # 每个起点模拟 runs_per_start 次：覆盖率不应超过上界
+        rng = BlockRNG(0)
+        cov = np.array([[[semo_coverage_rate(run(m, interation_time, r, c, rng=rng, topology=topology),
+                                             real_front)[2] for _ in range(runs_per_start)]
+                         for c in range(cols)] for r in range(rows)])
+        print(f"模拟覆盖率: 平均 {cov.mean():.4f}，各起点最好一次的平均 {cov.max(axis=2).mean():.4f}，"
+              f"从未覆盖前沿点的起点 {int((cov.max(axis=2) == 0).sum())}")
+        print(f"模拟覆盖率超出上界的最大值（应 <= 0）: {(cov.max(axis=2) - bound).max():.4f}")
+
+    # 大网格上每个起点的工作量都是一整遍传播，这里只抽样部分起点
+    n, k = 300, 256
+    big = generate_matrix(n, n, (0, 100), 2)
+    starts = np.random.default_rng(0).choice(n * n, k, replace=False)
+    t0 = time.time()
+    bound = max_coverage_bound(big, pareto_best_points(big), Topology.four(n, n), starts)
+    print(f"{n}x{n} 四邻域可达性上界（抽样 {k} 个起点）: 用时 {time.time() - t0:.2f}s，"
+          f"平均 {bound.mean():.4f}，上界为 0 的起点 {int((bound == 0).sum())} / {k}")
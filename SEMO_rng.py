@@ -0,0 +1,73 @@
+import numpy as np
+"""
+按块预取的随机数流：热循环不再每步调用两三次 random.choice / randrange，
+而是一次从 numpy Generator 取出一整块均匀浮点数 u 与方向下标 j（转成 Python 列表），逐个消费。
+
+- 选父节点：members[int(u * len(members))]
+- 变异方向：邻居表第 j 列，j ∈ [0, k)
+
+BlockRNG 可以注入到每次运行（rng=BlockRNG(seed)），同一个种子结果逐位可复现，不依赖全局状态；
+它同时提供 random / randrange / choice，可用于选起点、mutate_neighbor 等零散调用。
+"""
+
+# 块大小从 _MIN_BLOCK 开始倍增到 _MAX_BLOCK：提前停滞的短运行不会白白多取一大块随机数
+_MIN_BLOCK = 64
+_MAX_BLOCK = 1 << 14
+
+
+class BlockRNG:
+    """
+    包装 numpy Generator 的块式随机数源。
+    seed 可以是整数、SeedSequence 或已有的 numpy Generator（此时直接使用它）。
+    """
+
+    def __init__(self, seed=None, block=_MAX_BLOCK):
+        self.gen = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        self.block = block
+        self._u = []
+        self._pos = 0
+
+    def random(self):
+        """[0, 1) 上的均匀浮点数（从预取的块中取）"""
+        if self._pos >= len(self._u):
+            self._u = self.gen.random(self.block).tolist()
+            self._pos = 0
+        u = self._u[self._pos]
+        self._pos += 1
+        return u
+
+    def randrange(self, n):
+        return int(self.random() * n)
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    def blocks(self, n, k):
+        """
+        一次取 n 个 (u, j)：均匀浮点数列表与 [0, k) 方向下标列表。
+        方向同样由均匀数换算（j = int(v * k)），所以同一种子下不同 k 的运行
+        消耗完全相同的随机数（公共随机数，见 SEMO_paired.py）。
+        """
+        u = self.gen.random(n).tolist()
+        j = (self.gen.random(n) * k).astype(np.int64).tolist()
+        return u, j
+
+
+def random_draws(rng, k, iterations):
+    """
+    逐步产出 iterations 个 (u, j)，供 semo_search 热循环使用。
+    rng 为 BlockRNG 时按块从 numpy 取数；否则（random 模块或 random.Random）
+    同样按块调用其 random() / randrange(k)，结果仍由该 rng 的种子决定。
+    """
+    if isinstance(rng, BlockRNG):
+        fill = rng.blocks
+    else:
+        def fill(n, k, rand=rng.random, randrange=rng.randrange):
+            return [rand() for _ in range(n)], [randrange(k) for _ in range(n)]
+
+    block = _MIN_BLOCK
+    while iterations > 0:
+        n = min(block, iterations)
+        yield from zip(*fill(n, k))
+        iterations -= n
+        block = min(2 * block, _MAX_BLOCK)
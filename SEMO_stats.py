@@ -0,0 +1,265 @@
+import math
+import numpy as np
+"""
+流式统计累加器：多次运行的覆盖率 / 停滞步数不再存成列表，而是边跑边累加，内存恒定。
+所有累加器都支持 merge，并行进程各自累加后按固定顺序合并即可（合并顺序固定则结果逐位可复现）。
+
+- RunningStats：Welford 均值 / 方差（总体方差，与 np.std 一致）+ 最小值 / 最大值
+- CountHistogram：整数值（停滞步数）的精确直方图，可给出精确分位数
+- TDigest：合并式 t-digest，给出浮点值（覆盖率）的近似分位数
+- MonteCarloAccumulator：把以上组合成一次 Monte Carlo 实验的汇总
+"""
+
+
+class RunningStats:
+    """Welford 在线均值 / 方差，支持批量追加与合并（Chan 等人的并行公式）"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def push(self, x):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    def push_many(self, xs):
+        xs = np.asarray(xs, dtype=np.float64)
+        if xs.size == 0:
+            return
+        other = RunningStats()
+        other.n = int(xs.size)
+        other.mean = float(xs.mean())
+        other.m2 = float(((xs - other.mean) ** 2).sum())
+        other.min = float(xs.min())
+        other.max = float(xs.max())
+        self.merge(other)
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.n, self.mean, self.m2 = other.n, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        n = self.n + other.n
+        d = other.mean - self.mean
+        self.mean += d * other.n / n
+        self.m2 += other.m2 + d * d * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def var(self):
+        """总体方差（ddof=0）"""
+        return self.m2 / self.n if self.n else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.var)
+
+    def sample_std(self):
+        """样本标准差（ddof=1），用于置信区间"""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def half_width(self, z=1.96):
+        """均值的正态近似置信区间半宽 z * s / sqrt(n)（默认 95%）"""
+        return z * self.sample_std() / math.sqrt(self.n) if self.n > 1 else math.inf
+
+
+class CountHistogram:
+    """非负整数的精确直方图（如停滞步数），可合并，分位数精确"""
+
+    def __init__(self):
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def push_many(self, xs):
+        xs = np.asarray(xs, dtype=np.int64)
+        if xs.size == 0:
+            return
+        self._add(np.bincount(xs))
+
+    def push(self, x):
+        self.push_many([x])
+
+    def merge(self, other):
+        self._add(other.counts)
+
+    def _add(self, counts):
+        if counts.size > self.counts.size:
+            counts = counts.copy()
+            counts[:self.counts.size] += self.counts
+            self.counts = counts
+        else:
+            self.counts[:counts.size] += counts
+
+    @property
+    def n(self):
+        return int(self.counts.sum())
+
+    def quantile(self, q):
+        """最小的 x，使得 <= x 的样本比例 >= q"""
+        cum = np.cumsum(self.counts)
+        if cum.size == 0 or cum[-1] == 0:
+            return float("nan")
+        return int(np.searchsorted(cum, q * cum[-1], side="left"))
+
+
+class TDigest:
+    """
+    合并式 t-digest（Dunning），用少量质心近似任意浮点分布，分位数误差在两端最小。
+    delta 为压缩参数，质心个数约为 O(delta)。
+    """
+
+    def __init__(self, delta=200):
+        self.delta = delta
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self._buffer = []
+
+    def push(self, x):
+        self._buffer.append(float(x))
+        if len(self._buffer) >= 8 * self.delta:
+            self._compress()
+
+    def push_many(self, xs):
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        if xs.size:
+            self._compress(xs, np.ones(xs.size))
+
+    def merge(self, other):
+        other._compress()
+        self._compress(other.means, other.weights)
+
+    def _k(self, q):
+        return self.delta / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _compress(self, means=None, weights=None):
+        parts_m = [self.means, np.asarray(self._buffer)]
+        parts_w = [self.weights, np.ones(len(self._buffer))]
+        if means is not None:
+            parts_m.append(means)
+            parts_w.append(weights)
+        m = np.concatenate(parts_m)
+        w = np.concatenate(parts_w)
+        self._buffer = []
+        if m.size == 0:
+            return
+        order = np.argsort(m, kind="stable")
+        m, w = m[order].tolist(), w[order].tolist()
+
+        total = sum(w)
+        out_m, out_w = [m[0]], [w[0]]
+        done = 0.0
+        k_lo = self._k(0.0)
+        for x, wx in zip(m[1:], w[1:]):
+            q = min(1.0, (done + out_w[-1] + wx) / total)
+            if self._k(q) - k_lo <= 1.0:
+                nw = out_w[-1] + wx
+                out_m[-1] += (x - out_m[-1]) * wx / nw
+                out_w[-1] = nw
+            else:
+                done += out_w[-1]
+                k_lo = self._k(min(1.0, done / total))
+                out_m.append(x)
+                out_w.append(wx)
+        self.means = np.array(out_m)
+        self.weights = np.array(out_w)
+
+    @property
+    def n(self):
+        return float(self.weights.sum()) + len(self._buffer)
+
+    def quantile(self, q):
+        self._compress()
+        if self.means.size == 0:
+            return float("nan")
+        if self.means.size == 1:
+            return float(self.means[0])
+        # 以质心中心为节点做线性插值
+        centers = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        return float(np.interp(q, centers, self.means))
+
+
+class MonteCarloAccumulator:
+    """一次 Monte Carlo 实验（若干次 SEMO 运行）的覆盖率与停滞步数汇总"""
+
+    QUANTILES = (0.05, 0.5, 0.95)
+
+    def __init__(self):
+        self.coverage = RunningStats()
+        self.coverage_digest = TDigest()
+        self.stagnation = RunningStats()
+        self.stagnation_hist = CountHistogram()
+        self.trace = None   # 开启插桩时为 SEMO_trace.RunTrace 的合并记录
+
+    @property
+    def n(self):
+        return self.coverage.n
+
+    def push(self, coverage, stagnation_steps):
+        """追加一批运行结果（两个等长数组，或两个标量）"""
+        coverage = np.atleast_1d(coverage)
+        stagnation_steps = np.atleast_1d(stagnation_steps)
+        self.coverage.push_many(coverage)
+        self.coverage_digest.push_many(coverage)
+        self.stagnation.push_many(stagnation_steps)
+        self.stagnation_hist.push_many(stagnation_steps)
+
+    def merge(self, other):
+        self.coverage.merge(other.coverage)
+        self.coverage_digest.merge(other.coverage_digest)
+        self.stagnation.merge(other.stagnation)
+        self.stagnation_hist.merge(other.stagnation_hist)
+        if other.trace is not None:
+            if self.trace is None:
+                self.trace = type(other.trace)()
+            self.trace.merge(other.trace)
+
+    def summary(self):
+        """返回汇总字典（均值 / 标准差 / 最值 / 分位数）；没有任何运行时各项为 None（runs 为 0）"""
+        if self.n == 0:
+            keys = ["mean_cov", "std_cov", "min_cov", "max_cov",
+                    "mean_stag", "std_stag", "min_stag", "max_stag"]
+            for q in self.QUANTILES:
+                keys += [f"cov_q{int(q * 100)}", f"stag_q{int(q * 100)}"]
+            return {"runs": 0, **dict.fromkeys(keys)}
+        out = {
+            "runs": self.n,
+            "mean_cov": self.coverage.mean,
+            "std_cov": self.coverage.std,
+            "min_cov": self.coverage.min,
+            "max_cov": self.coverage.max,
+            "mean_stag": self.stagnation.mean,
+            "std_stag": self.stagnation.std,
+            "min_stag": int(self.stagnation.min),
+            "max_stag": int(self.stagnation.max),
+        }
+        for q in self.QUANTILES:
+            out[f"cov_q{int(q * 100)}"] = self.coverage_digest.quantile(q)
+            out[f"stag_q{int(q * 100)}"] = self.stagnation_hist.quantile(q)
+        return out
+
+    def print_summary(self, prefix=""):
+        """按原脚本的格式打印多次运行统计结果"""
+        if self.n == 0:
+            print(f"{prefix}没有运行结果（运行次数为 0）")
+            return
+        s = self.summary()
+        print(f"{prefix}平均覆盖率: {s['mean_cov']:.4f} ({s['mean_cov']*100:.2f}%)")
+        print(f"{prefix}覆盖率标准差: {s['std_cov']:.4f} ({s['std_cov']*100:.2f} %)")
+        print(f"{prefix}覆盖率分位数 5%/50%/95%: "
+              f"{s['cov_q5']:.4f} / {s['cov_q50']:.4f} / {s['cov_q95']:.4f}")
+        print(f"{prefix}最少停滞步数: {s['min_stag']}")
+        print(f"{prefix}最多停滞步数: {s['max_stag']}")
+        print(f"{prefix}平均停滞步数: {s['mean_stag']:.2f}")
+        print(f"{prefix}停滞步数标准差: {s['std_stag']:.2f}")
+        print(f"{prefix}停滞步数分位数 5%/50%/95%: "
+              f"{s['stag_q5']} / {s['stag_q50']} / {s['stag_q95']}")
@@ -0,0 +1,234 @@
+import hashlib
+import itertools
+import json
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from SEMO_topology import Topology
+from SEMO_batch import select_engine
+from SEMO_stats import MonteCarloAccumulator
+from SEMO_parallel import monte_carlo_stagnation
+from SEMO_8dir_cvg import generate_landscape, pareto_best_points
+"""
+扫描实验。
+
+1. 全起点扫描：从网格的每一个格点出发各运行 reps 次 SEMO，得到起点敏感性的完整图景。
+   复用 batch_semo_with_stagnation / scalar_semo_with_stagnation 的 starts 参数
+   （按前沿大小选择引擎，见 SEMO_batch.select_engine）：每批包含若干个完整起点的全部重复，
+   批内结果 reshape 成 (起点数, reps) 后直接求均值 / 标准差，不需要嵌套的 Python 循环。
+   结果是 (rows, cols) 的热力图，可按邻域分别保存为 .npz。
+
+2. 参数扫描：对 (size, iterations, neighborhood, landscape, seed, runs) 的参数网格逐格运行
+   Monte Carlo 实验，各格分配到本机多个进程。每格的汇总（.json）和逐次结果（.npz）
+   存入以“参数 + 代码版本”哈希命名的缓存文件；重跑或扩展扫描时只计算缓存中没有的格。
+"""
+
+
+def start_sweep(mat, iterations, reps, true_front, topology=None, rng=None,
+                batch_size=10000, stop_on_stagnation=True, engine="auto"):
+    """
+    每个起点运行 reps 次，返回字典：
+    mean_cov / std_cov / mean_stag / std_stag，均为 (rows, cols) 数组（标准差为总体标准差，同 np.std）。
+    engine 为 "auto" / "batch" / "scalar"（同 batch_semo_summary）。
+    """
+    rows, cols, _ = mat.shape
+    n_cells = rows * cols
+    if topology is None:
+        topology = Topology.four(rows, cols)
+    rng = np.random.default_rng(rng)
+    run, _ = select_engine(mat, true_front, engine)
+
+    out = {name: np.empty(n_cells) for name in ("mean_cov", "std_cov", "mean_stag", "std_stag")}
+    per_batch = max(1, batch_size // reps)
+    for s0 in range(0, n_cells, per_batch):
+        s1 = min(n_cells, s0 + per_batch)
+        starts = np.repeat(np.arange(s0, s1), reps)
+        coverage, stagnation_steps = run(
+            mat, iterations, starts.size, true_front, topology, rng=rng, starts=starts,
+            stop_on_stagnation=stop_on_stagnation)
+        coverage = coverage.reshape(-1, reps)
+        stagnation_steps = stagnation_steps.reshape(-1, reps)
+        out["mean_cov"][s0:s1] = coverage.mean(1)
+        out["std_cov"][s0:s1] = coverage.std(1)
+        out["mean_stag"][s0:s1] = stagnation_steps.mean(1)
+        out["std_stag"][s0:s1] = stagnation_steps.std(1)
+    return {name: arr.reshape(rows, cols) for name, arr in out.items()}
+
+
+def save_start_sweep(path, mat, iterations, reps, true_front, rng=None, batch_size=10000,
+                     engine="auto"):
+    """
+    对四邻域和八邻域分别做全起点扫描，保存到 path（.npz）：
+    键名为 mean_cov_4 / std_cov_4 / mean_stag_4 / std_stag_4 及对应的 _8，
+    另存 iterations 与 reps。返回写入的字典。
+    """
+    rows, cols, _ = mat.shape
+    rng = np.random.default_rng(rng)
+    arrays = {"iterations": np.int64(iterations), "reps": np.int64(reps)}
+    for tag, topology in (("4", Topology.four(rows, cols)), ("8", Topology.eight(rows, cols))):
+        sweep = start_sweep(mat, iterations, reps, true_front, topology, rng, batch_size,
+                            engine=engine)
+        arrays.update({f"{name}_{tag}": arr for name, arr in sweep.items()})
+    np.savez(path, **arrays)
+    return arrays
+
+
+# 参数扫描中每格的默认参数（param_grid 未给出的维度取这里的值）
+SWEEP_DEFAULTS = {
+    "size": 10,
+    "iterations": 10000,
+    "neighborhood": 4,
+    "landscape": "random",
+    "seed": 0,
+    "runs": 1000,
+}
+
+# 影响计算结果的源文件：内容变化即视为新的代码版本，旧缓存不再命中
+SWEEP_SOURCES = ("SEMO_8dir_cvg.py", "SEMO_topology.py", "SEMO_rng.py",
+                 "SEMO_parallel.py", "SEMO_stats.py", "SEMO_sweep.py")
+
+
+def code_version():
+    """参与计算的源文件内容的哈希"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256()
+    for name in SWEEP_SOURCES:
+        h.update(name.encode())
+        with open(os.path.join(here, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def param_grid(**axes):
+    """
+    由各维度的取值列表生成参数网格（笛卡尔积），未给出的维度取 SWEEP_DEFAULTS。
+    例如 param_grid(size=[10, 20], neighborhood=[4, 8]) 得到 4 个参数字典。
+    """
+    unknown = set(axes) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"未知的扫描参数: {sorted(unknown)}（可选 {sorted(SWEEP_DEFAULTS)}）")
+    names = list(SWEEP_DEFAULTS)
+    values = [list(axes.get(name, [SWEEP_DEFAULTS[name]])) for name in names]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def cell_key(params, version):
+    """缓存键：参数与代码版本的 SHA-256"""
+    payload = json.dumps({"params": params, "code": version}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def run_cell(params):
+    """计算一格：返回 (summary, coverage, stagnation_steps)"""
+    if params["neighborhood"] not in (4, 8):
+        raise ValueError(f"neighborhood 只能是 4 或 8: {params['neighborhood']!r}")
+    n = params["size"]
+    m = generate_landscape(params["landscape"], n, n, params["seed"])
+    true_front = pareto_best_points(m)
+    coverage, stagnation_steps = monte_carlo_stagnation(
+        m, params["iterations"], params["runs"], true_front,
+        eight=params["neighborhood"] == 8, seed=params["seed"], workers=1)
+    acc = MonteCarloAccumulator()
+    acc.push(coverage, stagnation_steps)
+    summary = acc.summary()
+    summary["front_size"] = len(true_front)
+    return summary, coverage, stagnation_steps
+
+
+def _cell_paths(cache_dir, key):
+    return os.path.join(cache_dir, key + ".json"), os.path.join(cache_dir, key + ".npz")
+
+
+def _store_cell(cache_dir, key, params, version, summary, coverage, stagnation_steps):
+    """先写临时文件再改名，中断的扫描不会留下半个缓存格"""
+    json_path, npz_path = _cell_paths(cache_dir, key)
+    tmp = npz_path + ".tmp.npz"
+    np.savez(tmp, coverage=coverage, stagnation_steps=stagnation_steps)
+    os.replace(tmp, npz_path)
+    record = {"key": key, "code": version, "params": params, "summary": summary}
+    with open(json_path + ".tmp", "w") as f:
+        json.dump(record, f, indent=2)
+    os.replace(json_path + ".tmp", json_path)
+    return record
+
+
+def load_cell_arrays(cache_dir, record):
+    """读取某格缓存的逐次结果：返回 (coverage, stagnation_steps)"""
+    with np.load(_cell_paths(cache_dir, record["key"])[1]) as data:
+        return data["coverage"], data["stagnation_steps"]
+
+
+def run_sweep(grid, cache_dir="sweep_cache", workers=None, verbose=True):
+    """
+    运行参数网格 grid（param_grid 的结果或参数字典列表），只计算缓存中缺失的格。
+    workers 为进程数（None 表示 CPU 核数，1 表示在当前进程内顺序执行）。
+    返回与 grid 顺序一致的记录列表：{"key", "code", "params", "summary"}。
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    version = code_version()
+    grid = [{**SWEEP_DEFAULTS, **params} for params in grid]
+    keys = [cell_key(params, version) for params in grid]
+
+    records = [None] * len(grid)
+    missing = []
+    for i, key in enumerate(keys):
+        json_path, npz_path = _cell_paths(cache_dir, key)
+        if os.path.exists(json_path) and os.path.exists(npz_path):
+            with open(json_path) as f:
+                records[i] = json.load(f)
+        else:
+            missing.append(i)
+    if verbose:
+        print(f"参数扫描: 共 {len(grid)} 格，缓存命中 {len(grid) - len(missing)} 格，"
+              f"需要计算 {len(missing)} 格（代码版本 {version}）")
+
+    def finish(i, result):
+        records[i] = _store_cell(cache_dir, keys[i], grid[i], version, *result)
+        if verbose:
+            s = records[i]["summary"]
+            print(f"  完成 {grid[i]}: 平均覆盖率 {s['mean_cov']:.4f}，平均停滞步数 {s['mean_stag']:.2f}")
+
+    if workers == 1 or len(missing) <= 1:
+        for i in missing:
+            finish(i, run_cell(grid[i]))
+    else:
+        # 每格算完立即写入缓存，扫描中断后重跑只需计算剩下的格
+        with ProcessPoolExecutor(workers) as ex:
+            futures = {ex.submit(run_cell, grid[i]): i for i in missing}
+            for fut in as_completed(futures):
+                finish(futures[fut], fut.result())
+    return records
+
+
+if __name__ == "__main__":
+    import time
+    from SEMO_8dir_cvg import generate_matrix
+
+    interation_time = 10000
+    rows, cols = 10, 10
+    reps = 200
+
+    np.random.seed(0)
+    m = generate_matrix(rows, cols, (0, 100), 2)
+    real_front = pareto_best_points(m)
+
+    t0 = time.time()
+    res = save_start_sweep("start_sweep.npz", m, interation_time, reps, real_front, rng=0)
+    print(f"全起点扫描 {rows}x{cols}，每个起点 {reps} 次，用时 {time.time() - t0:.2f}s，已保存 start_sweep.npz")
+    for tag in ("4", "8"):
+        cov = res[f"mean_cov_{tag}"]
+        print(f"{tag} neighbor: 起点平均覆盖率 最低 {cov.min():.4f} / 最高 {cov.max():.4f}，"
+              f"平均停滞步数 {res[f'mean_stag_{tag}'].mean():.2f}")
+        print(np.array2string(cov, precision=2, max_line_width=120))
+
+    # 参数扫描：第二次运行时全部命中缓存
+    grid = param_grid(size=[10, 20], neighborhood=[4, 8], landscape=["random", "anticorrelated"],
+                      runs=[2000])
+    for _ in range(2):
+        t0 = time.time()
+        records = run_sweep(grid, "sweep_cache", verbose=False)
+        print(f"参数扫描 {len(grid)} 格，用时 {time.time() - t0:.2f}s")
+    for rec in records:
+        p, s = rec["params"], rec["summary"]
+        print(f"{p['size']}x{p['size']} {p['neighborhood']} neighbor {p['landscape']:15s} "
+              f"前沿 {s['front_size']:3d} 个点，平均覆盖率 {s['mean_cov']:.4f}，平均停滞步数 {s['mean_stag']:.2f}")
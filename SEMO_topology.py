@@ -0,0 +1,160 @@
+import numpy as np
+from functools import lru_cache
+"""
+邻域拓扑：对一个 rows x cols 网格预计算一次 int32[N, k] 的邻居表（N = rows*cols），
+格点用展平下标 idx = r*cols + c 表示，第 j 列是沿 stencil[j] 方向走一步到达的格点。
+
+- 邻域（stencil）：四邻域、八邻域、半径 r 的 von Neumann 邻域，或任意 (dr, dc) 列表
+- 边界（border）："torus" 环绕、"clamp" 贴边截断、"reflect" 镜面反射
+
+变异 = 在邻居表中按一个随机整数查一次表；停滞检测与批量引擎共用同一张表。
+"""
+
+MOVES_4 = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+MOVES_8 = [(1, 0), (-1, 0), (0, 1), (0, -1),
+           (1, 1), (-1, -1), (1, -1), (-1, 1)]
+
+BORDERS = ("torus", "clamp", "reflect")
+
+# 超过该格点数时不预计算邻居表，改为按需计算（如内存映射的超大网格）。
+# 邻居表的 Python 列表形式约为 int32 表的 13 倍内存（1000x1000 八邻域约 0.4 GB），阈值不宜更高
+LAZY_CELLS = 1 << 20
+
+
+def _wrap(x, n, border):
+    """把越界坐标数组 x 按边界规则映射回 [0, n)"""
+    if border == "torus":
+        return x % n
+    if border == "clamp":
+        return np.clip(x, 0, n - 1)
+    if border == "reflect":
+        if n == 1:
+            return np.zeros_like(x)
+        period = 2 * (n - 1)
+        x = x % period
+        return np.where(x >= n, period - x, x)
+    raise ValueError(f"未知的边界类型: {border!r}（可选 {BORDERS}）")
+
+
+def _wrap_scalar(x, n, border):
+    """_wrap 的标量版本（供按需计算的邻居表使用）"""
+    if border == "torus":
+        return x % n
+    if border == "clamp":
+        return min(max(x, 0), n - 1)
+    if n == 1:
+        return 0
+    period = 2 * (n - 1)
+    x %= period
+    return period - x if x >= n else x
+
+
+class _LazyNeighbors:
+    """按需计算的邻居表，下标访问方式与 Topology.nbrs（列表的列表）相同"""
+
+    def __init__(self, rows, cols, stencil, border):
+        self.rows = rows
+        self.cols = cols
+        self.stencil = stencil
+        self.border = border
+
+    def __len__(self):
+        return self.rows * self.cols
+
+    def __getitem__(self, idx):
+        rows, cols, border = self.rows, self.cols, self.border
+        r, c = divmod(idx, cols)
+        return [_wrap_scalar(r + dr, rows, border) * cols + _wrap_scalar(c + dc, cols, border)
+                for dr, dc in self.stencil]
+
+
+class Topology:
+    """
+    网格邻域拓扑。
+    table  : numpy int32 数组 (N, k)，供向量化代码使用
+    nbrs   : 同一张表的 Python 列表形式，供标量热循环按下标直接查表
+    lazy=True（或格点数超过 LAZY_CELLS 时默认）不预计算邻居表：
+    table 为 None，nbrs 按需计算，标量运行函数照常可用。
+    """
+
+    def __init__(self, rows, cols, stencil, border="torus", lazy=None):
+        if not stencil:
+            raise ValueError("stencil 不能为空")
+        if border not in BORDERS:
+            raise ValueError(f"未知的边界类型: {border!r}（可选 {BORDERS}）")
+        self.rows = rows
+        self.cols = cols
+        self.stencil = [tuple(m) for m in stencil]
+        self.border = border
+        self.k = len(self.stencil)
+
+        if lazy is None:
+            lazy = rows * cols > LAZY_CELLS
+        if lazy:
+            self.table = None
+            self.nbrs = _LazyNeighbors(rows, cols, self.stencil, border)
+            return
+
+        r, c = np.divmod(np.arange(rows * cols), cols)
+        dr = np.array([m[0] for m in self.stencil])
+        dc = np.array([m[1] for m in self.stencil])
+        nr = _wrap(r[:, None] + dr, rows, border)
+        nc = _wrap(c[:, None] + dc, cols, border)
+        self.table = (nr * cols + nc).astype(np.int32)
+        self.nbrs = self.table.tolist()
+
+    @classmethod
+    def four(cls, rows, cols, border="torus"):
+        return cls(rows, cols, MOVES_4, border)
+
+    @classmethod
+    def eight(cls, rows, cols, border="torus"):
+        return cls(rows, cols, MOVES_8, border)
+
+    @classmethod
+    def von_neumann(cls, rows, cols, radius, border="torus"):
+        """曼哈顿距离 1..radius 以内的所有方向（radius=1 即四邻域）"""
+        if radius == 1:
+            return cls.four(rows, cols, border)
+        stencil = [(dr, dc)
+                   for dr in range(-radius, radius + 1)
+                   for dc in range(-radius, radius + 1)
+                   if 0 < abs(dr) + abs(dc) <= radius]
+        return cls(rows, cols, stencil, border)
+
+    @property
+    def n_cells(self):
+        return self.rows * self.cols
+
+    def index(self, r, c):
+        return r * self.cols + c
+
+    def cell(self, idx):
+        return divmod(idx, self.cols)
+
+    def neighbors(self, idx):
+        """展平下标 idx 的全部 k 个邻居（可能有重复，如小网格或 clamp 边界）"""
+        return self.nbrs[idx]
+
+    def neighbor(self, idx, j):
+        """沿第 j 个方向的邻居；j 为 [0, k) 的随机整数时即一次变异"""
+        return self.nbrs[idx][j]
+
+    def __repr__(self):
+        return f"Topology({self.rows}x{self.cols}, k={self.k}, border={self.border!r})"
+
+
+def default_topology(rows, cols, eight=False, lazy=None):
+    """
+    原有 4 / 8 邻域 + 环绕边界的拓扑，按网格大小缓存。
+    只保留最近两个（同一网格的 4 / 8 邻域），避免大网格的邻居列表在用完后一直驻留内存。
+    参数先规范化再查缓存：位置 / 关键字参数、eight 的真值写法、lazy=None 与等价的布尔值都命中同一项。
+    """
+    if lazy is None:
+        lazy = rows * cols > LAZY_CELLS
+    return _default_topology(int(rows), int(cols), bool(eight), bool(lazy))
+
+
+@lru_cache(maxsize=2)
+def _default_topology(rows, cols, eight, lazy):
+    return Topology(rows, cols, MOVES_8 if eight else MOVES_4, lazy=lazy)
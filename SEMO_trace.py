@@ -0,0 +1,83 @@
+from SEMO_stats import RunningStats
+"""
+SEMO 热循环的可选插桩：把 RunTrace 传给 semo_search（或 run_semo* 的 trace 参数）即开启，
+semo_search 改走带计数与计时的循环；不传时走原来的循环，没有任何额外开销。
+
+- 计数：提出的子节点数、接收数、被淘汰的档案点数，以及拒绝的原因
+  （duplicate = 与档案某点等值，dominance = 被档案某点严格支配；
+   其中 fast_rejects 走了父节点位掩码快速路径，memo_rejects 走了拒绝记忆）
+- 计时：各阶段累计纳秒数（select 取随机数 + 选父节点，fast_reject 位掩码 / 记忆，
+  archive 档案比较与更新，bookkeeping 停滞集合 / 覆盖率等维护，stop_check 停止条件）
+- 档案大小轨迹：每 sample_every 次迭代记录一次 (step, 档案大小)
+
+同一个 RunTrace 可以依次传给多次运行，计数与计时累加，size_trace 只保留最近一次运行；
+merge 用于合并多个进程 / 多个块的记录（合并后不保留 size_trace）。
+"""
+
+
+class RunTrace:
+    """一次或多次 SEMO 运行的插桩记录"""
+
+    COUNTERS = ("proposals", "accepts", "evictions", "duplicate_rejects",
+                "dominance_rejects", "fast_rejects", "memo_rejects")
+    PHASES = ("select", "fast_reject", "archive", "bookkeeping", "stop_check")
+
+    def __init__(self, sample_every=None):
+        self.sample_every = sample_every
+        self.runs = 0
+        self.counts = dict.fromkeys(self.COUNTERS, 0)
+        self.phase_ns = dict.fromkeys(self.PHASES, 0)
+        self.size_trace = []
+        self.final_size = RunningStats()
+        self.steps = RunningStats()
+
+    def begin(self, iterations):
+        """semo_search 开始一次运行时调用；返回本次运行的采样间隔"""
+        self.runs += 1
+        self.size_trace = []
+        if self.sample_every:
+            return self.sample_every
+        return max(1, iterations // 1000)
+
+    def end(self, counts, phase_ns, steps, final_size):
+        """semo_search 结束一次运行时调用，累加本次运行的计数与计时"""
+        for name, value in counts.items():
+            self.counts[name] += value
+        for name, value in phase_ns.items():
+            self.phase_ns[name] += value
+        self.steps.push(steps)
+        self.final_size.push(final_size)
+
+    def merge(self, other):
+        self.runs += other.runs
+        for name in self.COUNTERS:
+            self.counts[name] += other.counts[name]
+        for name in self.PHASES:
+            self.phase_ns[name] += other.phase_ns[name]
+        self.steps.merge(other.steps)
+        self.final_size.merge(other.final_size)
+        self.size_trace = []
+
+    def as_dict(self):
+        """结构化记录（可直接写成 JSON）"""
+        return {
+            "runs": self.runs,
+            "counts": dict(self.counts),
+            "phase_seconds": {name: ns / 1e9 for name, ns in self.phase_ns.items()},
+            "mean_steps": self.steps.mean,
+            "mean_final_size": self.final_size.mean,
+            "max_final_size": self.final_size.max,
+            "size_trace": list(self.size_trace),
+        }
+
+    def print_summary(self, prefix=""):
+        c = self.counts
+        proposals = max(c["proposals"], 1)
+        print(f"{prefix}运行次数: {self.runs}，平均迭代次数: {self.steps.mean:.2f}，"
+              f"平均最终档案大小: {self.final_size.mean:.2f}")
+        for name in self.COUNTERS:
+            print(f"{prefix}{name:18s} {c[name]:12d} ({c[name] / proposals * 100:6.2f}%)")
+        total = sum(self.phase_ns.values()) or 1
+        for name in self.PHASES:
+            ns = self.phase_ns[name]
+            print(f"{prefix}{name:18s} {ns / 1e9:10.4f}s ({ns / total * 100:6.2f}%)")
@@ -0,0 +1,123 @@
+import random
+import numpy as np
+import pytest
+from SEMO_topology import Topology
+from SEMO_batch import _Staircases, _dense_rank, batch_semo_summary, batch_semo_with_stagnation
+from SEMO_8dir_cvg import (FlatArchive, all_neighbors_dominated, generate_landscape,
+                           pareto_best_points, semo_coverage_rate,
+                           run_semo_with_stagnation, run_semo_with_stagnation_eight)
+
+ALPHA = 0.01
+
+
+def _ks_statistic(x, y):
+    """两样本 Kolmogorov–Smirnov 统计量 D 及其渐近 p 值"""
+    x = np.sort(x)
+    y = np.sort(y)
+    grid = np.concatenate([x, y])
+    d = np.abs(np.searchsorted(x, grid, side="right") / x.size
+               - np.searchsorted(y, grid, side="right") / y.size).max()
+    if d == 0:
+        return d, 1.0   # 级数在 λ=0 处不收敛；两个经验分布完全相同
+    en = np.sqrt(x.size * y.size / (x.size + y.size))
+    lam = (en + 0.12 + 0.11 / en) * d
+    j = np.arange(1, 101)
+    p = float(np.clip(2 * np.sum((-1) ** (j - 1) * np.exp(-2 * j * j * lam * lam)), 0, 1))
+    return d, p
+
+
+def _small_grid(rng):
+    """取值很少（大量等值点）的小整数网格"""
+    rows, cols = rng.integers(1, 10, 2).tolist()
+    return rng.integers(0, int(rng.choice([3, 10, 100])), (rows, cols, 2))
+
+
+def test_staircases_match_flat_archive():
+    """批量阶梯档案与 FlatArchive 逐步接收相同的候选点，结果逐项相同"""
+    for t in range(100):
+        rng = np.random.default_rng(t)
+        mat = _small_grid(rng)
+        A, B = mat[:, :, 0].ravel(), mat[:, :, 1].ravel()
+        n, runs = A.size, 6
+        starts = rng.integers(n, size=runs)
+        batch = _Staircases(starts, *_dense_rank(A), *_dense_rank(B), cap=2)
+        scalar = [FlatArchive(A.tolist(), B.tolist(), [s]) for s in starts.tolist()]
+        rows = np.arange(runs)
+        for _ in range(40):
+            batch.reserve(rows)
+            cells = rng.integers(n, size=runs)
+            accepted = batch.add(rows, cells, B)
+            for i, archive in enumerate(scalar):
+                assert archive.add(int(cells[i])) == accepted[i]
+                assert batch.members[i, :batch.size[i]].tolist() == archive.cells
+
+
+@pytest.mark.parametrize("stencil, border", [("four", "torus"), ("eight", "torus"),
+                                             ([(1, 0), (0, 2)], "clamp")])
+def test_staircases_stagnation_matches_scalar(stencil, border):
+    """批量停滞判定（含见证）与 all_neighbors_dominated 逐次一致"""
+    for t in range(60):
+        rng = np.random.default_rng(t)
+        mat = _small_grid(rng)
+        rows, cols, _ = mat.shape
+        if isinstance(stencil, str):
+            topology = getattr(Topology, stencil)(rows, cols, border)
+        else:
+            topology = Topology(rows, cols, stencil, border)
+        A, B = mat[:, :, 0].ravel(), mat[:, :, 1].ravel()
+        runs = 5
+        batch = _Staircases(rng.integers(A.size, size=runs), *_dense_rank(A), *_dense_rank(B), cap=2)
+        idx = np.arange(runs)
+        for _ in range(30):
+            batch.reserve(idx)
+            batch.add(idx, rng.integers(A.size, size=runs), B)
+            stagnant = batch.stagnant(idx, A, B, topology.table)
+            for i in range(runs):
+                pop = [divmod(x, cols) for x in batch.members[i, :batch.size[i]].tolist()]
+                assert stagnant[i] == all_neighbors_dominated(pop, mat, rows, cols, topology)
+
+
+@pytest.mark.parametrize("landscape", ["random", "anticorrelated"])
+@pytest.mark.parametrize("eight", [False, True])
+def test_batch_engine_matches_scalar_distribution(landscape, eight):
+    """批量引擎与逐次运行 run_semo_with_stagnation(_eight) 的覆盖率、停滞步数分布相同（KS 检验）"""
+    rows = cols = 10
+    runs = 2000
+    iterations = 10000
+    m = generate_landscape(landscape, rows, cols, seed=0)
+    real_front = pareto_best_points(m)
+
+    scalar_run = run_semo_with_stagnation_eight if eight else run_semo_with_stagnation
+    topology = Topology.eight(rows, cols) if eight else Topology.four(rows, cols)
+    scalar_rng = random.Random(1)
+    cov_s, stag_s = [], []
+    for _ in range(runs):
+        pop, steps = scalar_run(m, iterations, rng=scalar_rng)
+        cov_s.append(semo_coverage_rate(pop, real_front)[2])
+        stag_s.append(steps)
+    cov_b, stag_b = batch_semo_with_stagnation(m, iterations, runs, real_front, topology, rng=1)
+
+    for label, scalar, batch in (("覆盖率", cov_s, cov_b), ("停滞步数", stag_s, stag_b)):
+        _, p = _ks_statistic(np.array(scalar), batch)
+        assert p > ALPHA, f"{label}: 批量引擎与标量版本的分布不同（KS p={p:.4f}）"
+
+
+@pytest.mark.parametrize("engine", ["batch", "scalar"])
+def test_summary_sequential_stopping(engine, tmp_path):
+    """达到半宽目标后在批边界停止；结果是同一 rng 下固定次数运行的前缀，检查点恢复后不再多跑"""
+    m = generate_landscape("random", 10, 10, seed=0)
+    front = pareto_best_points(m)
+    topology = Topology.four(10, 10)
+    kw = dict(rng=1, batch_size=500, engine=engine, cov_half_width=0.02, min_runs=1000)
+    acc = batch_semo_summary(m, 1000, 20000, front, topology, **kw)
+    assert 1000 <= acc.n < 20000 and acc.n % 500 == 0
+    assert acc.coverage.half_width() <= 0.02
+    fixed = batch_semo_summary(m, 1000, acc.n, front, topology, rng=1, batch_size=500, engine=engine)
+    assert fixed.summary() == acc.summary()
+
+    ckpt = str(tmp_path / "seq.ckpt")
+    first = batch_semo_summary(m, 1000, 20000, front, topology, checkpoint=ckpt,
+                               keep_checkpoint=True, **kw)
+    again = batch_semo_summary(m, 1000, 20000, front, topology, checkpoint=ckpt,
+                               keep_checkpoint=True, **kw)
+    assert first.summary() == again.summary() == acc.summary()
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from SEMO_8dir_cvg import (generate_matrix, pareto_best_points, pareto_best_points_scan,
+                           update_population)
+
+
+def _grids(n, seed=0):
+    """
+    大量含等值点的随机小网格：decimals=0 / 1、很小的取值范围、1 行或 1 列，
+    以及定点整数存储。随机数来自局部 Generator，不触碰全局 np.random。
+    """
+    rng = np.random.default_rng(seed)
+    for t in range(n):
+        rows = 1 if rng.random() < 0.5 else int(rng.integers(1, 16))
+        cols = 1 if rng.random() < 0.5 else int(rng.integers(1, 16))
+        value_range = [(0, 1), (0, 3), (0, 10), (0, 100)][rng.integers(4)]
+        decimals = [0, 0, 1, 2][rng.integers(4)]
+        yield t, generate_matrix(rows, cols, value_range, decimals, integer=t % 3 == 0, rng=rng)
+
+
+@pytest.mark.parametrize("t, m", list(_grids(600)))
+def test_pareto_best_points_matches_references(t, m):
+    """pareto_best_points 与两个参考实现的结果完全相同（包括点的顺序与取值）"""
+    fast = pareto_best_points(m)
+    assert fast == pareto_best_points_scan(m)
+
+    rows, cols, _ = m.shape
+    population = []
+    for r in range(rows):
+        for c in range(cols):
+            update_population(population, (r, c), m)
+    population.sort(key=lambda rc: (m[rc][0], m[rc][1]), reverse=True)
+    assert [(r, c) for (r, c, a, b) in fast] == population
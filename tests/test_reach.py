@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from SEMO_topology import Topology
+from SEMO_reach import max_coverage_bound, reachable_front_mask
+from SEMO_batch import scalar_semo_with_stagnation
+from SEMO_8dir_cvg import pareto_best_points
+
+TOPOLOGIES = {
+    "four": Topology.four,
+    "eight": Topology.eight,
+    "clamp": lambda rows, cols: Topology(rows, cols, [(0, 1), (1, 0), (-1, -1)], border="clamp"),
+}
+
+
+def _small_grid(rng):
+    """取值很少（大量等值点）的小整数网格"""
+    rows, cols = rng.integers(1, 8, 2).tolist()
+    return rng.integers(0, int(rng.choice([3, 10, 100])), (rows, cols, 2))
+
+
+def _reference_mask(mat, true_front, topology):
+    """逐个起点在 G_x 上做广度优先搜索"""
+    rows, cols, _ = mat.shape
+    A, B = mat[:, :, 0].ravel(), mat[:, :, 1].ravel()
+    front_idx = [r * cols + c for (r, c, a, b) in true_front]
+    out = np.zeros((rows * cols, len(front_idx)), dtype=bool)
+    for x in range(rows * cols):
+        seen, todo = {x}, [x]
+        while todo:
+            p = todo.pop()
+            for q in topology.table[p].tolist():
+                if q in seen or (A[q] <= A[p] and B[q] <= B[p]) or (A[q] <= A[x] and B[q] <= B[x]):
+                    continue
+                seen.add(q)
+                todo.append(q)
+        out[x] = [f in seen for f in front_idx]
+    return out
+
+
+@pytest.mark.parametrize("name", sorted(TOPOLOGIES))
+def test_mask_matches_per_start_search(name):
+    """按块传播的结果与逐起点搜索相同，与分块大小、起点子集无关"""
+    for t in range(40):
+        rng = np.random.default_rng(t)
+        mat = _small_grid(rng)
+        rows, cols, _ = mat.shape
+        topology = TOPOLOGIES[name](rows, cols)
+        front = pareto_best_points(mat)
+        expected = _reference_mask(mat, front, topology)
+        assert np.array_equal(reachable_front_mask(mat, front, topology), expected)
+        assert np.array_equal(reachable_front_mask(mat, front, topology, block=64), expected)
+        starts = rng.permutation(rows * cols)[:5]
+        assert np.array_equal(reachable_front_mask(mat, front, topology, starts), expected[starts])
+
+
+@pytest.mark.parametrize("name", sorted(TOPOLOGIES))
+def test_simulated_coverage_within_bound(name):
+    """模拟得到的覆盖率不超过起点的上界"""
+    for t in range(20):
+        rng = np.random.default_rng(t)
+        mat = _small_grid(rng)
+        rows, cols, _ = mat.shape
+        topology = TOPOLOGIES[name](rows, cols)
+        front = pareto_best_points(mat)
+        bound = max_coverage_bound(mat, front, topology).ravel()
+        starts = np.repeat(np.arange(rows * cols), 10)
+        coverage, _ = scalar_semo_with_stagnation(mat, 2000, starts.size, front, topology,
+                                                  rng=t, starts=starts)
+        assert (coverage <= bound[starts] + 1e-12).all()
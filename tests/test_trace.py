@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from SEMO_rng import BlockRNG
+from SEMO_topology import Topology
+from SEMO_trace import RunTrace
+from SEMO_8dir_cvg import CoverageTracker, EarlyStop, pareto_best_points, semo_search
+
+TOPOLOGIES = {
+    "four": Topology.four,
+    "eight": Topology.eight,
+    "reflect": lambda rows, cols: Topology(rows, cols, [(1, 0), (0, 1), (2, 2)], border="reflect"),
+    "clamp": lambda rows, cols: Topology.von_neumann(rows, cols, 2, "clamp"),
+}
+
+# (stop_on_stagnation, memo, 提前停止条件)；EarlyStop 每次运行新建
+OPTIONS = {
+    "budget": (False, True, None),
+    "stagnation": (True, True, None),
+    "no_memo": (True, False, None),
+    "full_coverage": (False, True, lambda front: EarlyStop(true_front=front, stagnation=False)),
+    "stall": (False, True, lambda front: EarlyStop(stagnation=False, stall_window=50)),
+}
+
+
+def _grid(rng, n_obj):
+    """取值很少（大量等值点）的整数网格或浮点网格"""
+    rows, cols = rng.integers(1, 12, 2).tolist()
+    if rng.random() < 0.5:
+        return rng.integers(0, int(rng.choice([3, 10, 100])), (rows, cols, n_obj))
+    return np.round(rng.random((rows, cols, n_obj)) * 100, 2)
+
+
+def _run(mat, topology, seed, option, trace):
+    stop_on_stagnation, memo, make_stop = OPTIONS[option]
+    front = pareto_best_points(mat) if mat.shape[2] == 2 else None
+    early_stop = make_stop(front) if make_stop is not None and front is not None else None
+    coverage = CoverageTracker(front, topology.cols, 2000) if front is not None else None
+    rng = BlockRNG(seed)
+    start = (rng.randrange(topology.rows), rng.randrange(topology.cols))
+    pop, steps = semo_search(mat, 2000, topology, start, rng, stop_on_stagnation=stop_on_stagnation,
+                             coverage=coverage, memo=memo, early_stop=early_stop, trace=trace)
+    return (pop, steps, early_stop and (early_stop.reason, early_stop.step),
+            coverage and coverage.curve)
+
+
+@pytest.mark.parametrize("option", sorted(OPTIONS))
+@pytest.mark.parametrize("name", sorted(TOPOLOGIES))
+def test_traced_loop_matches_untraced(name, option):
+    """插桩循环与 semo_search 的主循环给出逐位相同的档案、迭代次数、停止原因与覆盖率曲线"""
+    for t in range(30):
+        rng = np.random.default_rng(t)
+        mat = _grid(rng, 2 if t % 5 else 3)
+        rows, cols, _ = mat.shape
+        topology = TOPOLOGIES[name](rows, cols)
+        trace = RunTrace()
+        expected = _run(mat, topology, t, option, None)
+        assert _run(mat, topology, t, option, trace) == expected
+        c = trace.counts
+        assert c["proposals"] == expected[1]
+        assert c["proposals"] == c["accepts"] + c["duplicate_rejects"] + c["dominance_rejects"]
+        assert trace.final_size.mean == len(expected[0])